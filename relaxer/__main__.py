@@ -1,11 +1,8 @@
 from datetime import datetime
 from fractions import Fraction
 from pathlib import Path
+from typing import Dict
 
-from relaxer.logical import pysmt
-from relaxer.logical.iterator import DFSTraceIterator
-from relaxer.optimization import pyaugmecon, pycddlib
-from relaxer.optimization.optimization import HybridOptimizer
 from relaxer.io import (
     DirectoryLocationHandler,
     EmptyDumpLocationHandler,
@@ -13,84 +10,129 @@ from relaxer.io import (
     JSONFileOutput,
     StdOutOutput,
 )
-from relaxer.relaxation import relax
-from relaxer.tracing.uppyyl import UppyylTASystem
 from relaxer import cli
-from relaxer.tracing.uppyyl.system import (
-    get_relaxation_for_bounds_of_system,
-)
+
+_DUMP_DIRECTORY_FORMAT = "%Y-%m-%d_%H-%M-%S-%f"
 
 
 def main():
     config = cli.parse_command_line()
+
+    # The solver and tracing backends are expensive to import, so they are only
+    # loaded once the command line was parsed successfully.
+    from relaxer.logical import pysmt
+    from relaxer.logical.iterator import DFSTraceIterator
+    from relaxer.optimization import pyaugmecon, pycddlib
+    from relaxer.optimization.optimization import HybridOptimizer
+    from relaxer.relaxation import relax
+    from relaxer.tracing.uppyyl import UppyylTASystem
+    from relaxer.tracing.uppyyl.system import (
+        get_relaxation_for_bounds_of_system,
+    )
+
     grid_points = 2
 
+    # Outputs that share a path share the writer, since a writer owns its file
+    file_outputs: Dict[Path, JSONFileOutput] = {}
+
     output = StdOutOutput()
     if config.output.type_ == "file":
-        output = JSONFileOutput(Path(config.output.path))
+        output = _json_file_output(file_outputs, Path(config.output.path))
 
     stats_output = EmptyOutput()
     if config.stats_config is not None:
         if config.stats_config.type_ == "json":
-            stats_output = JSONFileOutput(Path(config.stats_config.path))
+            stats_output = _json_file_output(
+                file_outputs, Path(config.stats_config.path)
+            )
 
     debug = config.debug
     dump = EmptyDumpLocationHandler()
 
-    for input in config.inputs:
-        timestamp = datetime.now().astimezone()
-        iso_timestamp = timestamp.isoformat()
+    dump_path = None
+    if config.dump_config is not None:
+        if config.dump_config.type_ == "directory":
+            dump_path = Path(config.dump_config.path)
+
+    try:
+        for input in config.inputs:
+            timestamp = datetime.now().astimezone()
+            iso_timestamp = timestamp.isoformat()
 
-        if config.dump_config is not None:
-            if config.dump_config.type_ == "directory":
+            logs_path = None
+            if dump_path is not None:
                 dump = DirectoryLocationHandler(
-                    Path(config.dump_config.path)
-                    / timestamp.strftime("%Y-%m-%d_%H-%M-%S-%f")
+                    dump_path / timestamp.strftime(_DUMP_DIRECTORY_FORMAT)
                 )
+                logs_path = dump.create_dump_location("pyaugmecon_logs").path
 
-        logs_path = None
-        if isinstance(dump, DirectoryLocationHandler):
-            logs_path = dump.create_dump_location("pyaugmecon_logs").path
-
-        irs = input.invariant_relaxations
-        grs = input.guard_relaxations
-        if input.relax_all:
-            irs_unsorted, grs_unsorted = get_relaxation_for_bounds_of_system(
-                input.model
-            )
+            irs = input.invariant_relaxations
+            grs = input.guard_relaxations
+            if input.relax_all:
+                irs_unsorted, grs_unsorted = get_relaxation_for_bounds_of_system(
+                    input.model
+                )
 
-            irs = sorted(irs_unsorted, key=lambda ir: str(ir))
-            grs = sorted(grs_unsorted, key=lambda gr: str(gr))
+                irs = sorted(irs_unsorted, key=str)
+                grs = sorted(grs_unsorted, key=str)
 
-        system = UppyylTASystem(input.model, irs, grs)
-        cs_iterator = DFSTraceIterator(system, input.depth)
+            system = UppyylTASystem(input.model, irs, grs)
+            cs_iterator = DFSTraceIterator(system, input.depth)
 
-        qe = pysmt.QuantifierEliminator(dump, debug)
+            qe = pysmt.QuantifierEliminator(
+                dump,
+                debug,
+                config.jobs,
+                None if config.qe_cache_path is None else Path(config.qe_cache_path),
+            )
 
-        # dnf_optimizer = pyaugmecon.Optimizer(grid_points, dump, logs_path)
-        conj_optimizer = pycddlib.Optimizer(grid_points, dump)
+            # dnf_optimizer = pyaugmecon.Optimizer(grid_points, dump, logs_path)
+            conj_optimizer = pycddlib.Optimizer(
+                grid_points, dump, config.cdd_number_type
+            )
 
-        # opt = HybridOptimizer(dnf_optimizer, conj_optimizer)
-        opt = conj_optimizer
+            # opt = HybridOptimizer(dnf_optimizer, conj_optimizer)
+            opt = conj_optimizer
 
-        optima, supported, stats = relax(cs_iterator, qe, opt, Fraction(1, 10))
-        stats["depth"] = input.depth
-        stats["grid_points"] = grid_points
-        stats["num_solutions"] = len(optima)
+            optima, supported, stats = relax(cs_iterator, qe, opt, Fraction(1, 10))
+            stats["depth"] = input.depth
+            stats["grid_points"] = grid_points
+            stats["num_solutions"] = len(optima)
 
-        sorted_optima = sorted(optima, reverse=True)
+            # Compare float keys, which are computed once per solution, instead of
+            # comparing the exact values on every comparison
+            sorted_optima = sorted(
+                optima,
+                key=lambda solution: tuple(map(float, solution)),
+                reverse=True,
+            )
 
-        output.write_solutions(
-            sorted_optima,
-            supported,
-            input.model,
-            irs,
-            grs,
-            input.depth,
-            iso_timestamp,
-        )
+            output.write_solutions(
+                sorted_optima,
+                supported,
+                input.model,
+                irs,
+                grs,
+                input.depth,
+                iso_timestamp,
+            )
 
-        stats_output.write_stats(stats, input.model, iso_timestamp)
+            stats_output.write_stats(stats, input.model, iso_timestamp)
+            # The results of finished inputs are kept if a later input is interrupted
+            output.flush()
+            stats_output.flush()
+    finally:
+        output.close()
+        stats_output.close()
+
+
+def _json_file_output(
+    file_outputs: Dict[Path, JSONFileOutput], path: Path
+) -> JSONFileOutput:
+    key = path.resolve()
+    if key not in file_outputs:
+        file_outputs[key] = JSONFileOutput(path)
+    return file_outputs[key]
 
 
 if __name__ == "__main__":
@@ -1,33 +1,46 @@
 import argparse
 import json
 from pathlib import Path
-from relaxer.io import Config
-
-
-parser = argparse.ArgumentParser(
-    prog="relaxer",
-    description="relaxer - A tool for relaxing clock constraints in UPPAAL models.",
-    epilog="For more information, see README.md.",
-)
-parser.add_argument("-m", "--model", type=Path, help="Path to the UPPAAL model.")
-parser.add_argument(
-    "-d",
-    "--depth",
-    type=int,
-    help="Depth of the search tree to explore. (length of the traces)",
-    default=10,
-)
-parser.add_argument(
-    "-c",
-    "--config",
-    type=Path,
-    help="Path to a json configuration file. CLI arguments override the configuration file.",
-)
-
-
-def parse_command_line() -> Config:
-
-    args = parser.parse_args()
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from relaxer.io import Config
+
+
+_parser: Optional[argparse.ArgumentParser] = None
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="relaxer",
+        description="relaxer - A tool for relaxing clock constraints in UPPAAL models.",
+        epilog="For more information, see README.md.",
+    )
+    parser.add_argument("-m", "--model", type=Path, help="Path to the UPPAAL model.")
+    parser.add_argument(
+        "-d",
+        "--depth",
+        type=int,
+        help="Depth of the search tree to explore. (length of the traces)",
+        default=10,
+    )
+    parser.add_argument(
+        "-c",
+        "--config",
+        type=Path,
+        help="Path to a json configuration file. CLI arguments override the configuration file.",
+    )
+    return parser
+
+
+def parse_command_line() -> "Config":
+    global _parser
+    if _parser is None:
+        _parser = _build_parser()
+
+    args = _parser.parse_args()
+
+    from relaxer.io import Config
 
     config = Config([])
     if args.config is not None:
@@ -1,6 +1,8 @@
 from dataclasses import dataclass
+from itertools import chain
 import json
 import math
+import os
 from numbers import Real
 from pathlib import Path
 from typing import (
@@ -54,6 +56,9 @@ class Config:
     stats_config: Optional[StatsConfig] = None
     debug: bool = False
     dump_config: Optional[DumpConfig] = None
+    jobs: int = 1
+    qe_cache_path: Optional[str] = None
+    cdd_number_type: str = "fraction"
 
     @staticmethod
     def from_json(json_dict: Dict[str, Any]) -> "Config":
@@ -91,6 +96,15 @@ class Config:
         if "debug" in json_dict:
             config.debug = json_dict["debug"]
 
+        if "jobs" in json_dict:
+            config.jobs = json_dict["jobs"]
+
+        if "qe_cache" in json_dict:
+            config.qe_cache_path = json_dict["qe_cache"]["path"]
+
+        if "cdd_number_type" in json_dict:
+            config.cdd_number_type = json_dict["cdd_number_type"]
+
         if "dump" in json_dict:
             config.dump_config = DumpConfig(
                 type_=json_dict["dump"]["type"], path=json_dict["dump"]["path"]
@@ -112,11 +126,23 @@ class SolutionWriter(Protocol):
     ):
         ...
 
+    def flush(self) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
 
 class StatsWriter(Protocol):
     def write_stats(self, stats: Dict[str, Any], model: str, timestamp: str):
         ...
 
+    def flush(self) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
 
 class DumpLocationHandler(Protocol):
     """A dump location handler is responsible for creating dump locations and managing them."""
@@ -164,8 +190,17 @@ class DumpLocation(Protocol):
 
 
 class JSONFileOutput:
+    """Collects solutions and stats and appends them to a json list in a file when flushed or closed.
+
+    The records that are already in the file are loaded once on the first flush. Later flushes only append the new
+    records to the end of the list, so the file is neither parsed nor rewritten again. Every path must only be written
+    by a single writer.
+    """
+
     def __init__(self, path: Path):
         self.path = path
+        self._pending: List[Any] = []
+        self._loaded = False
 
     def write_solutions(
         self,
@@ -196,24 +231,42 @@ class JSONFileOutput:
     def write_stats(self, stats: Dict[str, Any], model: str, timestamp: str):
         self._append_to_json_file({"model": model, "timestamp": timestamp, **stats})
 
+    def flush(self) -> None:
+        """Appends the records collected since the last flush to the records of the file."""
+        if len(self._pending) == 0:
+            return
+
+        if not self._loaded:
+            records = self._load_records()
+            records.extend(self._pending)
+            self.path.write_text(json.dumps(records))
+            self._loaded = True
+        else:
+            new_records = ", ".join(json.dumps(record) for record in self._pending)
+            with self.path.open("r+b") as file:
+                # Replace the closing bracket of the list, which is the last byte of the file
+                file.seek(-1, os.SEEK_END)
+                file.write(f", {new_records}]".encode())
+
+        self._pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+
     def _append_to_json_file(self, json_object: Dict[str, Any]):
-        if not self.path.exists():
-            with self.path.open("x"):
-                pass
+        self._pending.append(json_object)
 
-        with self.path.open() as f:
-            try:
-                l = json.load(f)
-            except json.JSONDecodeError:
-                l = []
+    def _load_records(self) -> List[Any]:
+        """Loads the records that are already in the file."""
+        try:
+            l = json.loads(self.path.read_bytes())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
 
         if not isinstance(l, list):
             l = [l]
 
-        l.append(json_object)
-
-        with self.path.open("w") as f:
-            json.dump(l, f, indent=4)
+        return l
 
     @staticmethod
     def _solutions_to_json(
@@ -234,26 +287,33 @@ class StdOutOutput:
         model: str,
         inv_relaxations: Sequence[InvariantRelaxation],
         guard_relaxations: Sequence[GuardRelaxation],
+        depth: int,
         timestamp: str,
     ):
         print(f"Model: {model}")
         print(f"Timestamp: {timestamp}")
+        print(f"Depth: {depth}")
         relaxation_string = "\n".join(
             f"#{i}: {relaxation}"
-            for i, relaxation in enumerate([*inv_relaxations] + [*guard_relaxations])
+            for i, relaxation in enumerate(chain(inv_relaxations, guard_relaxations))
         )
         print(f"==================== Relaxations ====================")
         print(relaxation_string)
         print(f"===================== Solutions =====================")
         print(f"Supported: {supported}")
 
-        header = ", ".join(
-            f"#{i}" for i in range(len(inv_relaxations) + len(guard_relaxations))
-        )
+        n_relaxations = len(inv_relaxations) + len(guard_relaxations)
+        header = ", ".join(f"#{i}" for i in range(n_relaxations))
         print(f"({header})")
         for solution in solutions:
             print(f"{solution}")
 
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
 
 class EmptyOutput:
     def write_solutions(
@@ -263,6 +323,7 @@ class EmptyOutput:
         model: str,
         inv_relaxations: Sequence[InvariantRelaxation],
         guard_relaxations: Sequence[GuardRelaxation],
+        depth: int,
         timestamp: str,
     ):
         pass
@@ -270,15 +331,21 @@ class EmptyOutput:
     def write_stats(self, stats: Dict[str, Any], model: str, timestamp: str):
         pass
 
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
 
 class EmptyDumpLocationHandler:
     """A dump location handler that does not create any dump locations."""
 
     def create_dump_location(self, name: str) -> DumpLocation:
-        return EmptyDumpLocation()
+        return _EMPTY_DUMP_LOCATION
 
     def get_location(self, name: str) -> DumpLocation:
-        return EmptyDumpLocation()
+        return _EMPTY_DUMP_LOCATION
 
 
 class DirectoryLocationHandler:
@@ -309,6 +376,9 @@ class EmptyDumpLocation:
         pass
 
 
+_EMPTY_DUMP_LOCATION = EmptyDumpLocation()
+
+
 class DirectoryDumpLocation:
     """A dump location that writes dumps to files in a directory."""
 
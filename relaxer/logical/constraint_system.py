@@ -1,12 +1,12 @@
 from dataclasses import dataclass
-from typing import Any, Dict, FrozenSet, Sequence, Set, Tuple
+from typing import Any, Dict, FrozenSet, Sequence, Tuple
 
 from relaxer.logical.formula import Formula
 from relaxer.logical.lra import Inequality, RelaxationVariable, Variable
 from relaxer.ta import SymbolicState
 
 
-@dataclass
+@dataclass(frozen=True)
 class TimedRelaxedTraceConstraints:
     symbolic_trace: Tuple[SymbolicState]
     relaxation_vars: FrozenSet[RelaxationVariable]
@@ -14,13 +14,21 @@ class TimedRelaxedTraceConstraints:
     inequalities: Tuple[FrozenSet[Inequality]]
     property_formulas: Tuple[FrozenSet[Formula]]
 
+    def __post_init__(self):
+        object.__setattr__(
+            self, "_all_inequalities", frozenset().union(*self.inequalities)
+        )
+        object.__setattr__(
+            self, "_all_property_formulas", frozenset().union(*self.property_formulas)
+        )
+
     @property
-    def all_inequalities(self) -> Set[Inequality]:
-        return set().union(*self.inequalities)
+    def all_inequalities(self) -> FrozenSet[Inequality]:
+        return self._all_inequalities  # type: ignore
 
     @property
-    def all_property_formulas(self) -> Set[Formula]:
-        return set().union(*self.property_formulas)
+    def all_property_formulas(self) -> FrozenSet[Formula]:
+        return self._all_property_formulas  # type: ignore
 
     def to_json(self) -> Dict[str, Any]:
         return {
@@ -43,8 +51,8 @@ class TimedRelaxedConstraintSystem:
     def get_delta_variables_for(self, width: int) -> Sequence[Variable]:
         return self.traces[width].delta_variables
 
-    def get_trace_inequalities_for(self, width: int) -> Set[Inequality]:
+    def get_trace_inequalities_for(self, width: int) -> FrozenSet[Inequality]:
         return self.traces[width].all_inequalities
 
-    def get_property_formulas_for(self, width: int) -> Set[Formula]:
+    def get_property_formulas_for(self, width: int) -> FrozenSet[Formula]:
         return self.traces[width].all_property_formulas
@@ -1,73 +1,146 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import FrozenSet, Set
+from dataclasses import dataclass, fields
+from typing import FrozenSet, Iterable, Set, Tuple
 
 
 class Formula(ABC):
+    # Formulas are created in large numbers, so all nodes use __slots__ instead of a __dict__
+    __slots__ = ()
+
     @property
     @abstractmethod
-    def atoms(self) -> Set["Atom"]:
+    def atoms(self) -> FrozenSet["Atom"]:
         ...
 
     @property
     def is_atom(self) -> bool:
         return False
 
+    def __reduce__(self):
+        # Frozen dataclasses with __slots__ cannot restore their state with setattr, so they are
+        # pickled by their fields and reconstructed through __init__
+        return (type(self), tuple(getattr(self, f.name) for f in fields(self)))
+
 
 class Atom(Formula, ABC):
+    __slots__ = ("_atoms",)
+
     @property
-    def atoms(self) -> Set["Atom"]:
-        return set([self])
+    def atoms(self) -> FrozenSet["Atom"]:
+        # Atoms are frozen dataclasses, so the singleton set is cached lazily on the instance
+        try:
+            return self._atoms  # type: ignore
+        except AttributeError:
+            atoms = frozenset((self,))
+            object.__setattr__(self, "_atoms", atoms)
+            return atoms
 
     @property
     def is_atom(self) -> bool:
         return True
 
 
-@dataclass(frozen=True)
-class Or(Formula):
-    arguments: FrozenSet[Formula]
+def _collect_atoms(arguments: Iterable[Formula]) -> FrozenSet[Atom]:
+    """Collects the atoms of the arguments of a connective without recursion.
 
-    @property
-    def atoms(self) -> Set[Atom]:
-        atoms: Set[Atom] = set()
-        for arg in self.arguments:
-            atoms.update(arg.atoms)
-        return atoms
+    Connectives cache their atoms when they are constructed, so only the direct arguments have to be
+    visited. Atoms are added directly instead of going through their singleton atom sets.
+    """
+    atoms: Set[Atom] = set()
+    for argument in arguments:
+        if argument.is_atom:
+            atoms.add(argument)  # type: ignore
+        else:
+            atoms.update(argument.atoms)
+    return frozenset(atoms)
 
-    def __str__(self) -> str:
-        return " OR ".join((f"({argument})" for argument in self.arguments))
 
+@dataclass(frozen=True, eq=False)
+class _Junction(Formula):
+    """Base class of the n-ary connectives. The arguments are deduplicated and keep the order of their first
+    occurrence, so equal junctions may order their arguments differently, but are hashed and compared as sets.
+    """
 
-@dataclass(frozen=True)
-class And(Formula):
-    arguments: FrozenSet[Formula]
+    __slots__ = ("arguments", "_atoms", "_hash", "_str")
+
+    arguments: Tuple[Formula, ...]
+
+    def __post_init__(self):
+        arguments = tuple(dict.fromkeys(self.arguments))
+        object.__setattr__(self, "arguments", arguments)
+        object.__setattr__(self, "_hash", hash((type(self), frozenset(arguments))))
+        object.__setattr__(self, "_atoms", _collect_atoms(arguments))
 
     @property
-    def atoms(self) -> Set[Atom]:
-        atoms: Set[Atom] = set()
-        for arg in self.arguments:
-            atoms.update(arg.atoms)
-        return atoms
+    def atoms(self) -> FrozenSet[Atom]:
+        return self._atoms  # type: ignore
+
+    def __hash__(self) -> int:
+        return self._hash  # type: ignore
 
     def __str__(self) -> str:
+        # The string is only built on the first call and cached on the frozen instance
+        try:
+            return self._str  # type: ignore
+        except AttributeError:
+            string = self._to_str()
+            object.__setattr__(self, "_str", string)
+            return string
+
+    @abstractmethod
+    def _to_str(self) -> str:
+        ...
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self) or hash(self) != hash(other):
+            return False
+        if self.arguments == other.arguments:  # type: ignore
+            return True
+        return frozenset(self.arguments) == frozenset(other.arguments)  # type: ignore
+
+
+@dataclass(frozen=True, eq=False)
+class Or(_Junction):
+    __slots__ = ()
+
+    def _to_str(self) -> str:
+        return " OR ".join((f"({argument})" for argument in self.arguments))
+
+
+@dataclass(frozen=True, eq=False)
+class And(_Junction):
+    __slots__ = ()
+
+    def _to_str(self) -> str:
         return " AND ".join((f"({argument})" for argument in self.arguments))
 
 
 @dataclass(frozen=True)
 class Not(Formula):
+    __slots__ = ("argument", "_atoms", "_str")
+
     argument: Formula
 
+    def __post_init__(self):
+        object.__setattr__(self, "_atoms", self.argument.atoms)
+
     @property
-    def atoms(self) -> Set[Atom]:
-        return self.argument.atoms
+    def atoms(self) -> FrozenSet[Atom]:
+        return self._atoms  # type: ignore
 
     def __str__(self) -> str:
-        return f"NOT({self.argument})"
+        try:
+            return self._str  # type: ignore
+        except AttributeError:
+            string = f"NOT({self.argument})"
+            object.__setattr__(self, "_str", string)
+            return string
 
 
 @dataclass(frozen=True)
 class BooleanConstant(Atom):
+    __slots__ = ("value",)
+
     value: bool
 
     def __str__(self) -> str:
@@ -1,9 +1,11 @@
+from bisect import bisect_right
 from collections import deque
+from enum import Enum, auto
 from fractions import Fraction
-from numbers import Real
 from typing import (
     Deque,
     Dict,
+    FrozenSet,
     Iterable,
     Iterator,
     List,
@@ -12,6 +14,8 @@ from typing import (
     Sequence,
     Set,
     Tuple,
+    Type,
+    Union,
 )
 
 from relaxer.logical.constraint_system import TimedRelaxedTraceConstraints
@@ -40,6 +44,33 @@ from relaxer.ta import (
 )
 from relaxer.tracing.system import SystemState, SystemTransition, TASystem
 
+# Shared coefficients of the encoding, so the hot loops do not construct new Fractions
+_ONE = Fraction(1)
+_MINUS_ONE = Fraction(-1)
+
+# Inequalities encoding a clock constraint, indexed by its operator.
+# (a + b == c) <=> (a + b <= c) and (a + b >= c)
+_OPERATOR_TO_INEQUALITY_SYMBOLS: Tuple[Optional[Tuple[InequalitySymbol, ...]], ...] = (
+    (InequalitySymbol.GreaterThan,),  # Operator.GreaterThan
+    (InequalitySymbol.LessThan,),  # Operator.LessThan
+    (InequalitySymbol.GreaterEqual,),  # Operator.GreaterEqual
+    (InequalitySymbol.LessEqual,),  # Operator.LessEqual
+    (InequalitySymbol.GreaterEqual, InequalitySymbol.LessEqual),  # Operator.Equal
+    None,  # Operator.NotEqual
+)
+
+# Coefficients of the relaxation variable of a relaxed clock constraint, indexed by its operator.
+# (d_0 + d_1 + ... >= b - p) <=> (d_0 + d_1 + ... + p >= b)
+# (d_0 + d_1 + ... <= b + p) <=> (d_0 + d_1 + ... - p <= b)
+_OPERATOR_TO_RELAXATION_COEFFICIENT: Tuple[Fraction, ...] = (
+    _ONE,  # Operator.GreaterThan
+    _MINUS_ONE,  # Operator.LessThan
+    _ONE,  # Operator.GreaterEqual
+    _MINUS_ONE,  # Operator.LessEqual
+    _MINUS_ONE,  # Operator.Equal
+    _MINUS_ONE,  # Operator.NotEqual
+)
+
 
 class TraceIterator(MethodUser, Protocol):
     @property
@@ -53,6 +84,119 @@ class TraceIterator(MethodUser, Protocol):
         ...
 
 
+class _PropertyInstruction(Enum):
+    Constant = auto()
+    ClockConstraint = auto()
+    Or = auto()
+    And = auto()
+    Not = auto()
+
+
+# A safety property specialized to a symbolic state as a postfix sequence of instructions
+_PropertyProgram = List[Tuple[_PropertyInstruction, Optional[object]]]
+
+
+def _is_constant(program: _PropertyProgram) -> bool:
+    return len(program) == 1 and program[0][0] is _PropertyInstruction.Constant
+
+
+def _compile_property(
+    property: Expression, location_ids: FrozenSet[str]
+) -> _PropertyProgram:
+    """Specializes a safety property to the locations of a symbolic state.
+
+    The location predicates are resolved and the resulting boolean constants are folded, such that
+    only the clock constraints remain to be encoded for each depth.
+
+    Args:
+        property (Expression): The safety property
+        location_ids (FrozenSet[str]): The ids of the locations of the symbolic state
+
+    Returns:
+        _PropertyProgram: The instructions encoding the property in postfix order
+    """
+    programs: List[_PropertyProgram] = []
+    stack: List[Tuple[Expression, bool]] = [(property, False)]
+    while len(stack) > 0:
+        expression, children_compiled = stack.pop()
+
+        if isinstance(expression, (BooleanOr, BooleanAnd)):
+            if not children_compiled:
+                stack.append((expression, True))
+                stack.append((expression.right, False))
+                stack.append((expression.left, False))
+                continue
+
+            right = programs.pop()
+            left = programs.pop()
+            if isinstance(expression, BooleanOr):
+                instruction, absorbing, neutral = _PropertyInstruction.Or, TRUE, FALSE
+            else:
+                instruction, absorbing, neutral = _PropertyInstruction.And, FALSE, TRUE
+
+            if any(_is_constant(p) and p[0][1] == absorbing for p in (left, right)):
+                programs.append([(_PropertyInstruction.Constant, absorbing)])
+            elif _is_constant(left) and left[0][1] == neutral:
+                programs.append(right)
+            elif _is_constant(right) and right[0][1] == neutral:
+                programs.append(left)
+            else:
+                programs.append(left + right + [(instruction, None)])
+
+        elif isinstance(expression, BooleanNot):
+            if not children_compiled:
+                stack.append((expression, True))
+                stack.append((expression.argument, False))
+                continue
+
+            argument = programs.pop()
+            if _is_constant(argument):
+                negated = FALSE if argument[0][1] == TRUE else TRUE
+                programs.append([(_PropertyInstruction.Constant, negated)])
+            else:
+                programs.append(argument + [(_PropertyInstruction.Not, None)])
+
+        elif isinstance(expression, LocationPredicate):
+            constant = TRUE if expression.location_id in location_ids else FALSE
+            programs.append([(_PropertyInstruction.Constant, constant)])
+
+        elif isinstance(expression, ClockConstraint):
+            programs.append([(_PropertyInstruction.ClockConstraint, expression)])
+
+        else:
+            raise ValueError(f"Unknown property expression: {expression}")
+
+    return programs.pop()
+
+
+def _encoded_junction(
+    junction: Type[Union[And, Or]],
+    absorbing: Formula,
+    neutral: Formula,
+    left: Formula,
+    right: Formula,
+) -> Formula:
+    """Combines two encoded formulas with a conjunction or disjunction. Arguments of the same
+    junction are flattened into the new one and boolean constants are simplified.
+    """
+    arguments: List[Formula] = []
+    for argument in (left, right):
+        if argument == absorbing:
+            return absorbing
+        if argument == neutral:
+            continue
+        if type(argument) is junction:
+            arguments.extend(argument.arguments)  # type: ignore
+        else:
+            arguments.append(argument)
+
+    if len(arguments) == 0:
+        return neutral
+    if len(arguments) == 1:
+        return arguments[0]
+    return junction(tuple(arguments))
+
+
 class DFSTraceIterator:
     """Trace iterator that iterates over all possible traces of a timed automaton system and generates the corresponding trace constraints."""
 
@@ -74,12 +218,28 @@ class DFSTraceIterator:
         self._relaxations = [
             RelaxationVariable(idx) for idx in range(self._system.num_of_relaxations)
         ]
+        # The relaxation summands are shared by all encoded relaxed clock constraints
+        self._relaxation_summands = {
+            coefficient: tuple(
+                Summand(coefficient, relaxation_var)
+                for relaxation_var in self._relaxations
+            )
+            for coefficient in (_ONE, _MINUS_ONE)
+        }
         self._delta_vars = [DeltaVariable(i) for i in range(self._depth + 1)]
+        # The delta summands are shared by all encoded clock constraints
+        self._delta_summands = tuple(
+            Summand(_ONE, delta_var) for delta_var in self._delta_vars
+        )
 
         self._symbolic_trace: List[SymbolicState]
         self._clock_resets: Dict[Clock, List[int]]
+        self._reset_journal: List[Tuple[int, Clock]]
         self._trace_ineqs: List[Set[Inequality]]
         self._property_formulas: List[Set[Formula]]
+        # Frozen encodings of the fully encoded depths, shared by all traces with the same prefix
+        self._frozen_trace_ineqs: List[FrozenSet[Inequality]]
+        self._frozen_property_formulas: List[FrozenSet[Formula]]
 
         self._transition_stack: Deque[Tuple[int, SystemTransition]]
 
@@ -93,8 +253,11 @@ class DFSTraceIterator:
 
     def __iter__(self) -> TraceIterator:
         self._clock_resets = {}
+        self._reset_journal = []
         self._trace_ineqs = []
         self._property_formulas = []
+        self._frozen_trace_ineqs = []
+        self._frozen_property_formulas = []
         self._symbolic_trace = []
 
         self._transition_stack = deque()
@@ -104,6 +267,7 @@ class DFSTraceIterator:
         self._trace_ineqs.append(set())
         self._property_formulas.append(set())
         self._encode_state(current_state_depth, initial_state)
+        self._freeze_depth(current_state_depth)
         self._symbolic_trace.append(initial_state.symbolic)
 
         current_state_depth += 1
@@ -120,15 +284,20 @@ class DFSTraceIterator:
             raise StopIteration
 
         target_state_depth, transition = self._transition_stack.pop()
-        self._copy_clock_resets(target_state_depth)
-        self._trace_ineqs = self._trace_ineqs[:target_state_depth]
-        self._property_formulas = self._property_formulas[:target_state_depth]
-        self._symbolic_trace = self._symbolic_trace[:target_state_depth]
+        # The encodings per depth form a stack over the current trace prefix. Only the
+        # depths below the popped transition are discarded, the prefix is kept in place.
+        self._truncate_clock_resets(target_state_depth)
+        del self._trace_ineqs[target_state_depth:]
+        del self._property_formulas[target_state_depth:]
+        del self._frozen_trace_ineqs[target_state_depth:]
+        del self._frozen_property_formulas[target_state_depth:]
+        del self._symbolic_trace[target_state_depth:]
 
         self._trace_ineqs.append(set())
         self._property_formulas.append(set())
         self._encode_transition(target_state_depth, transition)
         self._encode_state(target_state_depth, transition.target)
+        self._freeze_depth(target_state_depth)
         self._symbolic_trace.append(transition.target.symbolic)
 
         target_state_depth += 1
@@ -141,10 +310,8 @@ class DFSTraceIterator:
         symbolic_trace = tuple(self._symbolic_trace)
         relaxation_vars = frozenset(self._relaxations)
         delta_vars = tuple(self._delta_vars[:target_state_depth])
-        inequalities = tuple((frozenset(ineqs) for ineqs in self._trace_ineqs))
-        property_formulas = tuple(
-            (frozenset(formulas) for formulas in self._property_formulas)
-        )
+        inequalities = tuple(self._frozen_trace_ineqs)
+        property_formulas = tuple(self._frozen_property_formulas)
 
         return TimedRelaxedTraceConstraints(
             symbolic_trace, relaxation_vars, delta_vars, inequalities, property_formulas
@@ -158,22 +325,27 @@ class DFSTraceIterator:
         self._encode_guards(target_state_depth, transition.edges)
         self._encode_resets(target_state_depth, transition.edges)
 
+    def _freeze_depth(self, depth: int):
+        self._frozen_trace_ineqs.append(frozenset(self._trace_ineqs[depth]))
+        self._frozen_property_formulas.append(frozenset(self._property_formulas[depth]))
+
     def _encode_deadlock(self, state_depth: int):
         self._property_formulas[state_depth].add(FALSE)
 
     def _encode_locations(self, current_depth: int, state: SymbolicState):
         for location in state.locations:
             for invariant in location.invariants:
-                # c_i_j ~ b
                 summands = self._substitute_clock(current_depth, invariant.clock)
                 encoded_rel = self._encoded_relaxation(invariant)
                 if encoded_rel is not None:
                     summands.append(encoded_rel)
-                self._encode_clock_constraint(current_depth, invariant, summands)
 
-                # c_i_j + d_i_j ~ b
-                summands.append(Summand(1, self._delta_vars[current_depth]))  # type: ignore
-                self._encode_clock_constraint(current_depth, invariant, summands)
+                # c_i_j ~ b and c_i_j + d_i_j ~ b
+                encoded = DFSTraceIterator._encoded_clock_constraint_pair(
+                    invariant, summands, self._delta_summands[current_depth]
+                )
+                for inequalities in encoded:
+                    self._trace_ineqs[current_depth].update(inequalities)
 
             if location.urgent:
                 self._encode_urgent(current_depth)
@@ -183,7 +355,7 @@ class DFSTraceIterator:
             for guard in edge.guards:
                 # c_i_[j-1] + delta_i_[j-1] ~ b
                 summands = self._substitute_clock(target_depth - 1, guard.clock) + [
-                    Summand(1, self._delta_vars[target_depth - 1])  # type: ignore
+                    self._delta_summands[target_depth - 1]
                 ]
                 encoded_rel = self._encoded_relaxation(guard)
                 if encoded_rel is not None:
@@ -198,39 +370,31 @@ class DFSTraceIterator:
                     self._clock_resets[reset] = []
 
                 self._clock_resets[reset].append(target_depth)
+                self._reset_journal.append((target_depth, reset))
 
     def _encode_safety_properties(
         self,
         current_depth: int,
         state: SystemState,
     ):
-        # TODO: Use safety_property skeleton
+        location_ids = frozenset(location.id for location in state.symbolic.locations)
         for property in self._system.safety_properties(state):
+            # The property is specialized to the state once and evaluated with and without the delta
+            program = _compile_property(property, location_ids)
+            if _is_constant(program):
+                self._property_formulas[current_depth].add(program[0][1])  # type: ignore
+                continue
+
             self._property_formulas[current_depth].update(
-                (
-                    self._encoded_property(
-                        property,
-                        current_depth,
-                        state.symbolic,
-                        (),
-                    ),
-                    self._encoded_property(
-                        property,
-                        current_depth,
-                        state.symbolic,
-                        (self._delta_vars[current_depth],),
-                    ),
-                )
+                self._evaluated_property(program, current_depth)
             )
 
     def _encode_urgent(self, current_depth: int):
-        delta_sum = Sum((Summand(Fraction(1), self._delta_vars[current_depth]),))
+        delta_sum = Sum((self._delta_summands[current_depth],))
         self._trace_ineqs[current_depth].update(
             (
-                Inequality(left=delta_sum, symbol=InequalitySymbol.LessEqual, right=0),  # type: ignore
-                Inequality(
-                    left=delta_sum, symbol=InequalitySymbol.GreaterEqual, right=0  # type: ignore
-                ),
+                Inequality.interned(delta_sum, InequalitySymbol.LessEqual, 0),  # type: ignore
+                Inequality.interned(delta_sum, InequalitySymbol.GreaterEqual, 0),  # type: ignore
             )
         )
 
@@ -243,144 +407,98 @@ class DFSTraceIterator:
         encoded = DFSTraceIterator._encoded_clock_constraint(constraint, summands)
         self._trace_ineqs[current_depth].update(encoded)
 
-    def _encoded_property(
+    def _evaluated_property(
         self,
-        property: Expression,
+        program: "_PropertyProgram",
         current_depth: int,
-        state: SymbolicState,
-        deltas_to_add: Iterable[Variable],
-    ) -> Formula:
-        if isinstance(property, BooleanOr):
-            return Or(
-                frozenset(
-                    (
-                        self._encoded_property(
-                            property.left,
-                            current_depth,
-                            state,
-                            deltas_to_add,
-                        ),
-                        self._encoded_property(
-                            property.right,
-                            current_depth,
-                            state,
-                            deltas_to_add,
-                        ),
-                    )
-                ),
-            )
+    ) -> Tuple[Formula, Formula]:
+        """Evaluates a specialized safety property at the current depth. The encodings without and with
+        the delta of the current depth are evaluated in a single pass, sharing the clock substitutions.
+
+        Args:
+            program (_PropertyProgram): The safety property specialized to the current state
+            current_depth (int): The current depth
+
+        Returns:
+            Tuple[Formula, Formula]: The encoded property without and with the delta of the current depth
+        """
+        results: List[Tuple[Formula, Formula]] = []
+        for instruction, operand in program:
+            if instruction is _PropertyInstruction.Constant:
+                results.append((operand, operand))  # type: ignore
+
+            elif instruction is _PropertyInstruction.ClockConstraint:
+                summands = self._substitute_clock(current_depth, operand.clock)  # type: ignore
+                encoded = DFSTraceIterator._encoded_clock_constraint_pair(
+                    operand, summands, self._delta_summands[current_depth]  # type: ignore
+                )
+                results.append((And(encoded[0]), And(encoded[1])))
 
-        elif isinstance(property, BooleanAnd):
-            return And(
-                frozenset(
+            elif instruction is _PropertyInstruction.Or:
+                right = results.pop()
+                left = results.pop()
+                results.append(
                     (
-                        self._encoded_property(
-                            property.left,
-                            current_depth,
-                            state,
-                            deltas_to_add,
-                        ),
-                        self._encoded_property(
-                            property.right,
-                            current_depth,
-                            state,
-                            deltas_to_add,
-                        ),
+                        _encoded_junction(Or, TRUE, FALSE, left[0], right[0]),
+                        _encoded_junction(Or, TRUE, FALSE, left[1], right[1]),
                     )
                 )
-            )
 
-        elif isinstance(property, BooleanNot):
-            return Not(
-                self._encoded_property(
-                    property.argument,
-                    current_depth,
-                    state,
-                    deltas_to_add,
+            elif instruction is _PropertyInstruction.And:
+                right = results.pop()
+                left = results.pop()
+                results.append(
+                    (
+                        _encoded_junction(And, FALSE, TRUE, left[0], right[0]),
+                        _encoded_junction(And, FALSE, TRUE, left[1], right[1]),
+                    )
                 )
-            )
 
-        elif isinstance(property, LocationPredicate):
-            location_id = property.location_id
-            if location_id in (location.id for location in state.locations):
-                return TRUE
-            return FALSE
+            else:
+                argument = results.pop()
+                results.append((Not(argument[0]), Not(argument[1])))
 
-        elif isinstance(property, ClockConstraint):
-            summands = self._substitute_clock(current_depth, property.clock) + [
-                Summand(Fraction(1, 1), delta_var) for delta_var in deltas_to_add
-            ]
-
-            inequalities = DFSTraceIterator._encoded_clock_constraint(
-                property, summands
-            )
+        return results.pop()
 
-            return And(frozenset(inequalities))
+    @staticmethod
+    def _encoded_clock_constraint_pair(
+        constraint: ClockConstraint,
+        summands: List[Summand],
+        delta_summand: Summand,
+    ) -> Tuple[Tuple[Inequality, ...], Tuple[Inequality, ...]]:
+        """Encodes a clock constraint without and with an additional delta summand.
 
-        raise ValueError(f"Unknown property expression: {property}")
+        Returns:
+            Tuple[Tuple[Inequality, ...], Tuple[Inequality, ...]]: The inequalities without and with the delta summand
+        """
+        without_delta = tuple(
+            DFSTraceIterator._encoded_clock_constraint(constraint, summands)
+        )
+        summands.append(delta_summand)
+        with_delta = tuple(
+            DFSTraceIterator._encoded_clock_constraint(constraint, summands)
+        )
+        return without_delta, with_delta
 
     @staticmethod
     def _encoded_clock_constraint(
         constraint: ClockConstraint,
         summands: List[Summand],
     ) -> Iterator[Inequality]:
-        clock_sum = Sum(tuple(summands))
-
-        if constraint.operator == Operator.Equal:
-            # (a + b == c) <=> (a + b <= c) and (a + b >= c)
-            yield Inequality(
-                left=clock_sum,
-                symbol=InequalitySymbol.GreaterEqual,
-                right=constraint.limit,
-            )
-
-            yield Inequality(
-                left=clock_sum,
-                symbol=InequalitySymbol.LessEqual,
-                right=constraint.limit,
-            )
-
-        elif (
-            constraint.operator == Operator.GreaterThan
-            or constraint.operator == Operator.GreaterEqual
-        ):
-            symbol = InequalitySymbol.GreaterEqual
-            if constraint.operator == Operator.GreaterThan:
-                symbol = InequalitySymbol.GreaterThan
-
-            yield Inequality(
-                left=clock_sum,
-                symbol=symbol,
-                right=constraint.limit,
-            )
-
-        elif (
-            constraint.operator == Operator.LessThan
-            or constraint.operator == Operator.LessEqual
-        ):
-            symbol = InequalitySymbol.LessEqual
-            if constraint.operator == Operator.LessThan:
-                symbol = InequalitySymbol.LessThan
-
-            yield Inequality(
-                left=clock_sum,
-                symbol=symbol,
-                right=constraint.limit,
-            )
-
-        else:
+        symbols = _OPERATOR_TO_INEQUALITY_SYMBOLS[constraint.operator]
+        if symbols is None:
             raise RuntimeError(
                 f"Operator {constraint.operator} not supported for clock constraint encoding"
             )
 
+        clock_sum = Sum(tuple(summands))
+        for symbol in symbols:
+            yield Inequality.interned(clock_sum, symbol, constraint.limit)
+
     def _encoded_relaxation(self, constraint: ClockConstraint) -> Optional[Summand]:
         if constraint.is_relaxed:
-            relaxation_var = self._relaxations[constraint.relaxation_idx]  # type: ignore because this is checked by is_relaxed
-            coefficient = DFSTraceIterator._coefficient_from_operator(
-                constraint.operator
-            )
-
-            return Summand(coefficient, relaxation_var)
+            coefficient = _OPERATOR_TO_RELAXATION_COEFFICIENT[constraint.operator]
+            return self._relaxation_summands[coefficient][constraint.relaxation_idx]  # type: ignore because this is checked by is_relaxed
 
     def _substitute_clock(self, current_depth: int, clock: Clock) -> List[Summand]:
         """Substitute the clock at the current depth with a sum of all delta variables since the last reset before the current depth.
@@ -395,35 +513,27 @@ class DFSTraceIterator:
         # Every clock is reset at the initial state
         last_reset = 0
         if clock in self._clock_resets:
-            # If the clock was reset after the initial state, get the last reset before current_depth
-            for reset in self._clock_resets[clock]:
-                if reset > current_depth:
-                    break
-                last_reset = reset
-
-        last_reset = last_reset
+            # If the clock was reset after the initial state, get the last reset before current_depth.
+            # The resets are appended in increasing depth order.
+            resets = self._clock_resets[clock]
+            idx = bisect_right(resets, current_depth)
+            if idx > 0:
+                last_reset = resets[idx - 1]
 
         # Return summands of deltas since the last reset
-        return [
-            Summand(Fraction(1, 1), delta_var)
-            for delta_var in self._delta_vars[last_reset:current_depth]
-        ]
+        return list(self._delta_summands[last_reset:current_depth])
 
-    def _copy_clock_resets(self, until_depth: int):
-        for clock in self._clock_resets:
-            new_resets = []
-            for reset in self._clock_resets[clock]:
-                if reset >= until_depth:
-                    break
+    def _truncate_clock_resets(self, until_depth: int):
+        """Removes all clock resets at or after the given depth.
 
-                new_resets.append(reset)
-            self._clock_resets[clock] = new_resets
-
-    @staticmethod
-    def _coefficient_from_operator(operator: Operator) -> Real:
-        if operator == Operator.GreaterThan or operator == Operator.GreaterEqual:
-            # (d_0 + d_1 + ... >= b - p) <=> (d_0 + d_1 + ... + p >= b)
-            return Fraction(1)
+        The reset journal records the resets in the order they were encoded, which is ordered by depth.
+        Therefore only the resets that are actually removed are visited.
 
-        # (d_0 + d_1 + ... <= b + p) <=> (d_0 + d_1 + ... - p <= b)
-        return Fraction(-1)
+        Args:
+            until_depth (int): The first depth whose resets are removed
+        """
+        while (
+            len(self._reset_journal) > 0 and self._reset_journal[-1][0] >= until_depth
+        ):
+            _, clock = self._reset_journal.pop()
+            self._clock_resets[clock].pop()
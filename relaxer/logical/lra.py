@@ -1,14 +1,27 @@
+import re
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from enum import Enum
+from collections import Counter
+from dataclasses import dataclass, fields
+from enum import IntEnum
 from numbers import Real
 from typing import Collection, Sequence, Tuple
+from weakref import WeakValueDictionary
 
 from relaxer.logical.formula import Atom
 
 
+def _reduce_by_fields(instance):
+    # Frozen dataclasses with __slots__ cannot restore their state with setattr, so they are
+    # pickled by their fields and reconstructed through __init__
+    return (type(instance), tuple(getattr(instance, f.name) for f in fields(instance)))
+
+
 @dataclass(frozen=True)
 class Variable(ABC):
+    # Variables, summands and sums are created in large numbers, so they use __slots__ instead of a
+    # __dict__. The identifier of a variable is computed once on construction.
+    __slots__ = ("_identifier",)
+
     @property
     @abstractmethod
     def identifier(self) -> str:
@@ -25,14 +38,22 @@ class Variable(ABC):
             return False
         return self.identifier == __o.identifier
 
+    def __reduce__(self):
+        return _reduce_by_fields(self)
+
 
 @dataclass(frozen=True, eq=False)
 class DeltaVariable(Variable):
+    __slots__ = ("depth",)
+
     depth: int
 
+    def __post_init__(self):
+        object.__setattr__(self, "_identifier", f"delta_{self.depth}")
+
     @property
     def identifier(self) -> str:
-        return f"delta_{self.depth}"
+        return self._identifier  # type: ignore
 
     def __hash__(self) -> int:
         return super().__hash__()
@@ -40,37 +61,49 @@ class DeltaVariable(Variable):
 
 @dataclass(frozen=True, eq=False)
 class RelaxationVariable(Variable):
+    __slots__ = ("relaxation_idx",)
+
     relaxation_idx: int
 
+    def __post_init__(self):
+        object.__setattr__(self, "_identifier", f"relax_{self.relaxation_idx}")
+
     @property
     def identifier(self) -> str:
-        return f"relax_{self.relaxation_idx}"
+        return self._identifier  # type: ignore
 
     def __hash__(self) -> int:
         return super().__hash__()
 
 
+_VARIABLE_PATTERN = r"(delta|relax)_(\d+)"
+_VARIABLE_RE = re.compile(_VARIABLE_PATTERN)
+_SUMMAND_RE = re.compile(r"\s*([^\s*]+)\s*\*\s*" + _VARIABLE_PATTERN + r"\s*(?:\+|$)")
+_INEQUALITY_RE = re.compile(r"\s*(.*?)\s*(<=|>=|<|>)\s*(\S+)\s*")
+
+
 def variable_from_string(s: str) -> Variable:
-    prefix = s[:6]
-    if prefix == "delta_":
-        components = s.split("_")
-        return DeltaVariable(int(components[1]))
+    match = _VARIABLE_RE.fullmatch(s)
+    if match is None:
+        raise ValueError(f'Cannot parse variable from string "{s}"')
 
-    if prefix == "relax_":
-        components = s.split("_")
-        return RelaxationVariable(int(components[1]))
+    return _variable_from_components(match.group(1), match.group(2))
 
-    raise ValueError(f'Cannot parse variable from string "{s}"')
 
+def _variable_from_components(kind: str, index: str) -> Variable:
+    if kind == "delta":
+        return DeltaVariable(int(index))
+    return RelaxationVariable(int(index))
 
-class InequalitySymbol(Enum):
-    GreaterThan = ">"
-    LessThan = "<"
-    GreaterEqual = ">="
-    LessEqual = "<="
+
+class InequalitySymbol(IntEnum):
+    GreaterThan = 0
+    LessThan = 1
+    GreaterEqual = 2
+    LessEqual = 3
 
     def __str__(self) -> str:
-        return self.value
+        return _INEQUALITY_SYMBOL_TOKENS[self]
 
     def turned(self) -> "InequalitySymbol":
         """Turns the inequality symbol around.
@@ -78,29 +111,45 @@ class InequalitySymbol(Enum):
         Returns:
             InequalitySymbol: The turned inequality symbol.
         """
-        if self == InequalitySymbol.GreaterThan:
-            return InequalitySymbol.LessThan
-        if self == InequalitySymbol.LessThan:
-            return InequalitySymbol.GreaterThan
-        if self == InequalitySymbol.GreaterEqual:
-            return InequalitySymbol.LessEqual
-        else:
-            # self == InequalitySymbol.LessEqual
-            return InequalitySymbol.GreaterEqual
+        return _TURNED_INEQUALITY_SYMBOLS[self]
 
     @staticmethod
     def from_string(s: str) -> "InequalitySymbol":
         return InequalitySymbol(s)
 
+    @classmethod
+    def _missing_(cls, value):
+        # Symbols can also be looked up by their token, e.g. InequalitySymbol(">=")
+        if isinstance(value, str) and value in _INEQUALITY_SYMBOL_TOKENS:
+            return cls(_INEQUALITY_SYMBOL_TOKENS.index(value))
+        return None
+
+
+# Lookup tables indexed by the inequality symbol
+_INEQUALITY_SYMBOL_TOKENS = (">", "<", ">=", "<=")
+_TURNED_INEQUALITY_SYMBOLS = (
+    InequalitySymbol.LessThan,
+    InequalitySymbol.GreaterThan,
+    InequalitySymbol.LessEqual,
+    InequalitySymbol.GreaterEqual,
+)
+
 
 @dataclass(frozen=True)
 class Summand:
+    __slots__ = ("coefficient", "var")
+
     coefficient: Real
     var: Variable
 
+    def __reduce__(self):
+        return _reduce_by_fields(self)
+
 
 @dataclass(frozen=True)
 class Sum:
+    __slots__ = ("summands", "_key")
+
     summands: Tuple[Summand]
 
     @property
@@ -114,29 +163,50 @@ class Sum:
             (f"{summand.coefficient}*{summand.var}" for summand in self.summands)
         )
 
+    def __post_init__(self):
+        # Sums are equal regardless of the order of their summands, so they are compared
+        # and hashed by the multiset of their summands.
+        object.__setattr__(self, "_key", frozenset(Counter(self.summands).items()))
+
     def __eq__(self, other) -> bool:
-        for summand in set(self.summands + other.summands):
-            if self.summands.count(summand) != other.summands.count(summand):
-                return False
-        return True
+        if not isinstance(other, Sum):
+            return False
+        return self._key == other._key  # type: ignore
+
+    def __hash__(self) -> int:
+        return hash(self._key)  # type: ignore
+
+    def __reduce__(self):
+        return _reduce_by_fields(self)
 
     @staticmethod
     def from_string(s: str) -> "Sum":
+        if s.strip() == "0":
+            return Sum(())
+
         summands = []
-        for summand_str in s.split("+"):
-            summand_str = summand_str.strip()
-            if summand_str == "0":
-                continue
-            coefficient, var_str = summand_str.split("*")
-            coefficient = float(coefficient)
-            var = variable_from_string(var_str)
-            summands.append(Summand(coefficient, var))  # type: ignore
+        pos = 0
+        # The summands have to follow each other without gaps and the last one must not end with a "+"
+        while pos < len(s):
+            match = _SUMMAND_RE.match(s, pos)
+            if match is None:
+                raise ValueError(f'Cannot parse sum from string "{s}"')
+            coefficient_str, kind, index = match.groups()
+            var = _variable_from_components(kind, index)
+            summands.append(Summand(float(coefficient_str), var))  # type: ignore
+            pos = match.end()
+
+        if len(summands) == 0 or s.rstrip().endswith("+"):
+            raise ValueError(f'Cannot parse sum from string "{s}"')
 
         return Sum(tuple(summands))
 
 
 @dataclass(frozen=True)
 class Inequality(Atom):
+    # Inequalities are interned through weak references
+    __slots__ = ("left", "symbol", "right", "__weakref__")
+
     left: Sum
     symbol: InequalitySymbol
     right: Real
@@ -153,14 +223,42 @@ class Inequality(Atom):
 
     @staticmethod
     def from_string(s: str) -> "Inequality":
-        splits = s.split()
-        right_str = splits[-1]
-        symbol_str = splits[-2]
-        left_str = " ".join(splits[:-2])
+        match = _INEQUALITY_RE.fullmatch(s)
+        if match is None:
+            raise ValueError(f'Cannot parse inequality from string "{s}"')
+
+        left_str, symbol_str, right_str = match.groups()
         left = Sum.from_string(left_str)
         right = float(right_str)
         return Inequality(left, InequalitySymbol(symbol_str), right)  # type: ignore
 
+    @staticmethod
+    def interned(left: Sum, symbol: InequalitySymbol, right: Real) -> "Inequality":
+        """Returns the inequality with the given components. Structurally equal inequalities that are
+        alive at the same time are represented by the same object, which keeps the encodings small
+        and lets set operations on them succeed on identity.
+
+        Args:
+            left (Sum): The left side of the inequality
+            symbol (InequalitySymbol): The inequality symbol
+            right (Real): The bound on the right side of the inequality
+
+        Returns:
+            Inequality: The interned inequality
+        """
+        key = (left, symbol, right)
+        inequality = _INTERNED_INEQUALITIES.get(key)
+        if inequality is None:
+            inequality = Inequality(left, symbol, right)
+            _INTERNED_INEQUALITIES[key] = inequality
+        return inequality
+
+
+# The keys only reference the components, so unused inequalities are released
+_INTERNED_INEQUALITIES: "WeakValueDictionary[Tuple[Sum, InequalitySymbol, Real], Inequality]" = (
+    WeakValueDictionary()
+)
+
 
 @dataclass
 class DNFFormula:
@@ -1,9 +1,12 @@
 from fractions import Fraction
 from numbers import Real
-from typing import List, Set, Tuple
+from typing import Dict, List, Set, Tuple
+from weakref import WeakKeyDictionary
 
 import pysmt.shortcuts as pysmt
+from pysmt.environment import Environment
 from pysmt.fnode import FNode
+from pysmt.operators import MINUS, PLUS, SYMBOL, TIMES
 from pysmt.typing import REAL
 
 from relaxer.logical.constraint_system import TimedRelaxedTraceConstraints
@@ -19,33 +22,68 @@ from relaxer.logical.lra import (
 )
 
 
+# pysmt constructors of the comparisons, indexed by the inequality symbol
+_PYSMT_COMPARISONS = (pysmt.GT, pysmt.LT, pysmt.GE, pysmt.LE)
+# The terms are cached per pysmt environment, since terms of a reset environment are invalid. The
+# environments are weakly referenced, so the terms are dropped together with their environment.
+_PYSMT_SYMBOLS: "WeakKeyDictionary[Environment, Dict[str, FNode]]" = WeakKeyDictionary()
+_PYSMT_REALS: "WeakKeyDictionary[Environment, Dict[Real, FNode]]" = WeakKeyDictionary()
+
+
 def trace_constraints_to_pysmt(
     trace_constraints: TimedRelaxedTraceConstraints,
 ) -> FNode:
-    relaxation_constraints = [
-        variable_to_pysmt(var) >= 0 for var in trace_constraints.relaxation_vars
-    ]
     deltas = [variable_to_pysmt(var) for var in trace_constraints.delta_variables]
-    trace_formula = pysmt.And(
-        [inequality_to_pymst(ineq) for ineq in trace_constraints.all_inequalities]
-        + [variable_to_pysmt(var) >= 0 for var in trace_constraints.delta_variables]
-    )
-    properties_formula = pysmt.And(
-        (
+    trace_conjuncts = [
+        inequality_to_pymst(ineq) for ineq in trace_constraints.all_inequalities
+    ]
+    trace_conjuncts.extend(delta >= 0 for delta in deltas)
+    trace_formula = _flat_conjunction(trace_conjuncts)
+    properties_formula = _flat_conjunction(
+        [
             formula_to_pysmt(formula)
             for formula in trace_constraints.all_property_formulas
-        )
+        ]
     )
 
-    return pysmt.And(
-        pysmt.ForAll(deltas, pysmt.Implies(trace_formula, properties_formula)),
-        *relaxation_constraints,
+    conjuncts = [pysmt.ForAll(deltas, pysmt.Implies(trace_formula, properties_formula))]
+    conjuncts.extend(
+        variable_to_pysmt(var) >= 0 for var in trace_constraints.relaxation_vars
     )
+    return _flat_conjunction(conjuncts)
+
+
+def _flat_conjunction(conjuncts: List[FNode]) -> FNode:
+    """Builds a single conjunction node. Nested conjunctions are flattened into it and true
+    conjuncts are dropped. A false conjunct makes the whole conjunction false.
+
+    Args:
+        conjuncts (List[FNode]): The conjuncts
+
+    Returns:
+        FNode: The conjunction of the conjuncts
+    """
+    flat = []
+    for conjunct in conjuncts:
+        if conjunct.is_and():
+            flat.extend(conjunct.args())
+        elif conjunct.is_false():
+            return pysmt.FALSE()
+        elif not conjunct.is_true():
+            flat.append(conjunct)
+
+    if len(flat) == 0:
+        return pysmt.TRUE()
+    if len(flat) == 1:
+        return flat[0]
+    return pysmt.And(flat)
 
 
 def formula_to_pysmt(input: Formula) -> FNode:
     if isinstance(input, And):
-        return pysmt.And((formula_to_pysmt(argument) for argument in input.arguments))
+        return _flat_conjunction(
+            [formula_to_pysmt(argument) for argument in input.arguments]
+        )
     elif isinstance(input, Or):
         return pysmt.Or((formula_to_pysmt(argument) for argument in input.arguments))
     elif isinstance(input, Not):
@@ -61,30 +99,54 @@ def formula_to_pysmt(input: Formula) -> FNode:
 
 
 def inequality_to_pymst(ineq: Inequality) -> FNode:
-    summands = (summand_to_pymst(summand) for summand in ineq.left.summands)
-    sum = pysmt.Plus(pysmt.Real(0), *summands)
-
-    if ineq.symbol == InequalitySymbol.GreaterThan:
-        return pysmt.GT(sum, pysmt.Real(ineq.right))
-    elif ineq.symbol == InequalitySymbol.GreaterEqual:
-        return pysmt.GE(sum, pysmt.Real(ineq.right))
-    elif ineq.symbol == InequalitySymbol.LessEqual:
-        return pysmt.LE(sum, pysmt.Real(ineq.right))
-    elif ineq.symbol == InequalitySymbol.LessThan:
-        return pysmt.LT(sum, pysmt.Real(ineq.right))
+    summands = [summand_to_pymst(summand) for summand in ineq.left.summands]
+    if len(summands) == 0:
+        sum = _pysmt_real(0, pysmt.get_env())
+    elif len(summands) == 1:
+        sum = summands[0]
     else:
-        raise ValueError(f"Unsupported InequalitySymbol: {ineq.symbol}")
+        sum = pysmt.Plus(summands)
+
+    right = _pysmt_real(ineq.right, pysmt.get_env())
+    return _PYSMT_COMPARISONS[ineq.symbol](sum, right)
 
 
 def summand_to_pymst(summand: Summand) -> FNode:
     var = variable_to_pysmt(summand.var)
-    coefficient = summand.coefficient
+    if summand.coefficient == 1:
+        return var
 
-    return coefficient * var
+    return pysmt.Times(_pysmt_real(summand.coefficient, pysmt.get_env()), var)
 
 
 def variable_to_pysmt(var: Variable) -> FNode:
-    return pysmt.Symbol(var.identifier, REAL)
+    return _pysmt_symbol(var.identifier, pysmt.get_env())
+
+
+def _pysmt_symbol(identifier: str, env: Environment) -> FNode:
+    symbols = _PYSMT_SYMBOLS.get(env)
+    if symbols is None:
+        symbols = {}
+        _PYSMT_SYMBOLS[env] = symbols
+
+    symbol = symbols.get(identifier)
+    if symbol is None:
+        symbol = env.formula_manager.Symbol(identifier, REAL)
+        symbols[identifier] = symbol
+    return symbol
+
+
+def _pysmt_real(value: Real, env: Environment) -> FNode:
+    reals = _PYSMT_REALS.get(env)
+    if reals is None:
+        reals = {}
+        _PYSMT_REALS[env] = reals
+
+    real = reals.get(value)
+    if real is None:
+        real = env.formula_manager.Real(value)
+        reals[value] = real
+    return real
 
 
 def dnf_from_pysmt(pysmt_dnf: FNode) -> DNFFormula:
@@ -128,41 +190,51 @@ def inequality_from_pysmt(pysmt_inequality: FNode) -> Inequality:
 
     sum = Sum(tuple(pysmt_to_summands(variables)))
 
-    return Inequality(left=sum, symbol=symbol, right=bound)  # type: ignore
+    return Inequality.interned(sum, symbol, bound)  # type: ignore
 
 
 def pysmt_to_summands(pysmt_sum: FNode) -> List[Summand]:
-    if pysmt_sum.is_symbol():
-        return [Summand(Fraction(1), pysmt_to_variable(pysmt_sum))]
-
-    if pysmt_sum.is_times():
-        pysmt_coeff = pysmt_sum.arg(0)
-        pysmt_var = pysmt_sum.arg(1)
-
-        if not pysmt_coeff.is_constant():
-            # coefficient is right
-            pysmt_coeff = pysmt_sum.arg(1)
-            pysmt_var = pysmt_sum.arg(0)
-
-        coefficient = pysmt_to_constant_value(pysmt_coeff)
-        var = pysmt_to_variable(pysmt_var)
-
-        return [Summand(coefficient, var)]
-
-    if pysmt_sum.is_minus():
-        left = pysmt_sum.arg(0)
-        negated = pysmt_sum.arg(1)
-
-        return pysmt_to_summands(left) + pysmt_to_summands(-1 * negated)
-
-    if not pysmt_sum.is_plus():
-        raise ValueError(
-            f"Unexpected relation {pysmt_sum}. Expected linear real relation."
-        )
-
     summands = []
-    for arg in pysmt_sum.args():
-        summands += pysmt_to_summands(arg)
+    # Each pending node is paired with the coefficient it is multiplied with
+    stack: List[Tuple[FNode, Real]] = [(pysmt_sum, Fraction(1))]
+    while len(stack) > 0:
+        node, multiplier = stack.pop()
+        node_type = node.node_type()
+
+        if node_type == SYMBOL:
+            summands.append(Summand(multiplier, pysmt_to_variable(node)))
+
+        elif node_type == PLUS:
+            # Reversed, so the summands keep their order
+            stack.extend((arg, multiplier) for arg in reversed(node.args()))
+
+        elif node_type == MINUS:
+            stack.append((node.arg(1), -multiplier))
+            stack.append((node.arg(0), multiplier))
+
+        elif node_type == TIMES:
+            factor = None
+            for arg in node.args():
+                if arg.is_constant():
+                    multiplier = multiplier * pysmt_to_constant_value(arg)
+                elif factor is None:
+                    factor = arg
+                else:
+                    raise ValueError(
+                        f"Unexpected relation {pysmt_sum}. Expected linear real relation."
+                    )
+
+            if factor is None:
+                raise ValueError(
+                    f"Unexpected relation {pysmt_sum}. Expected linear real relation."
+                )
+            stack.append((factor, multiplier))
+
+        else:
+            raise ValueError(
+                f"Unexpected relation {pysmt_sum}. Expected linear real relation."
+            )
+
     return summands
 
 
@@ -1,11 +1,18 @@
 from collections import defaultdict
-from fractions import Fraction
-from typing import Tuple
+from typing import Dict, List, Tuple
 from numpy import append
+
+# The rationals of pysmt, which are gmpy2.mpq when pysmt uses gmpy2 and fractions.Fraction otherwise
+from pysmt.constants import Fraction
 from pysmt.fnode import FNode
 from pysmt.walkers import IdentityDagWalker
 from pysmt.formula import FormulaManager
 import pysmt.operators
+from pysmt.operators import PLUS, REAL_CONSTANT, SYMBOL, TIMES
+
+
+def _symbol_name_of_item(item: Tuple[FNode, Fraction]) -> str:
+    return item[0].symbol_name()
 
 
 class NormalFormTransformer(IdentityDagWalker):
@@ -17,80 +24,74 @@ class NormalFormTransformer(IdentityDagWalker):
     where aᵢ are real constants, xᵢ are real variables, b is a real constant and ~ is in {<, ≤, =}.
     """
 
+    def __init__(self, env=None, invalidate_memoization=None):
+        super().__init__(env, invalidate_memoization)
+        # The constants and coefficients of visited nodes, so they are only converted once per walk
+        self._constants: Dict[FNode, Fraction] = {}
+        self._coefficient_variable_pairs: Dict[FNode, Tuple[Fraction, FNode]] = {}
+        # Real constant nodes by value, which are reused by all walks of the environment
+        self._reals: Dict[Fraction, FNode] = {}
+
     @property
     def _manager(self) -> FormulaManager:
         return self.env.formula_manager
 
+    def walk(self, formula, **kwargs):
+        self._constants.clear()
+        self._coefficient_variable_pairs.clear()
+        return super().walk(formula, **kwargs)
+
     def walk_le(self, formula, args, **kwargs):
-        return self._inequality_constants_right(self._manager.LE, args)
+        return self._inequality_constants_right(formula, self._manager.LE, args)
 
     def walk_lt(self, formula, args, **kwargs):
-        return self._inequality_constants_right(self._manager.LT, args)
+        return self._inequality_constants_right(formula, self._manager.LT, args)
 
     def walk_equals(self, formula, args, **kwargs):
-        return self._inequality_constants_right(self._manager.Equals, args)
+        return self._inequality_constants_right(formula, self._manager.Equals, args)
 
     def walk_plus(self, formula, args, **kwargs):
-        var_coeff = defaultdict(lambda: Fraction(0))
+        var_coeff = defaultdict(Fraction)
         constant = Fraction(0)
-        for arg in args:
-            if arg.is_real_constant():
-                constant += Fraction(arg.constant_value())
+        # Nested sums of any depth are flattened in a single sweep
+        stack = list(args)
+        while len(stack) > 0:
+            arg = stack.pop()
+            node_type = arg.node_type()
+            if node_type == REAL_CONSTANT:
+                constant += self._constant(arg)
                 continue
 
-            if arg.is_plus():
-                for summand in arg.args():
-                    if summand.is_real_constant():
-                        constant += Fraction(summand.constant_value())
-                        continue
-
-                    coefficient, variable = self._coefficient_variable_pair(summand)
-                    var_coeff[variable] += coefficient
+            if node_type == PLUS:
+                stack.extend(arg.args())
                 continue
 
-            assert arg.is_times()
+            assert node_type == TIMES
             coefficient, variable = self._coefficient_variable_pair(arg)
 
             var_coeff[variable] += coefficient
 
-        summands = (
-            self._manager.Times(self._manager.Real(coefficient), variable)
-            for variable, coefficient in sorted(
-                filter(lambda item: item[1] != 0, var_coeff.items()),
-                key=lambda item: item[0].symbol_name(),
-            )
-        )
+        items = [(variable, coeff) for variable, coeff in var_coeff.items() if coeff]
+        items.sort(key=_symbol_name_of_item)
+        times = self._manager.Times
+        summands = [
+            times(self._real(coefficient), variable) for variable, coefficient in items
+        ]
 
         if constant == 0:
             return self._manager.Plus(summands)
 
-        return self._manager.Plus(self._manager.Real(constant), *summands)
+        return self._manager.Plus(self._real(constant), *summands)
 
     def walk_minus(self, formula, args, **kwargs):
-        minuend = args[0]
-        subtrahend = args[1]
-        if (
-            subtrahend.is_real_constant()
-            or subtrahend.is_symbol()
-            or subtrahend.is_times()
-        ):
-            return self.walk_plus(formula, [minuend, self._flip_sign(subtrahend)])
-
-        if not subtrahend.is_plus():
-            raise self._not_lra_error(formula)
-
-        summands = [minuend]
-        for summand in subtrahend.args():
-            summands.append(self._flip_sign(summand))
-
-        return self.walk_plus(formula, summands)
+        return self.walk_plus(formula, self._difference_summands(formula, *args))
 
     def walk_times(self, formula, args, **kwargs):
         coefficient = Fraction(1)
         variable = None
         for factor in args:
             if factor.is_real_constant():
-                coefficient *= Fraction(factor.constant_value())
+                coefficient *= self._constant(factor)
                 continue
 
             if factor.is_plus():
@@ -106,20 +107,16 @@ class NormalFormTransformer(IdentityDagWalker):
                     if not constant.is_real_constant():
                         raise self._not_lra_error(formula)
 
-                    factor *= Fraction(constant.constant_value())
+                    factor *= self._constant(constant)
 
                 for summand in sum.args():
                     if summand.is_real_constant():
-                        summands.append(
-                            self._manager.Real(
-                                Fraction(summand.constant_value()) * factor
-                            )
-                        )
+                        summands.append(self._real(self._constant(summand) * factor))
                         continue
 
                     if summand.is_symbol():
                         summands.append(
-                            self._manager.Times(self._manager.Real(factor), summand)
+                            self._manager.Times(self._real(factor), summand)
                         )
                         continue
 
@@ -129,7 +126,7 @@ class NormalFormTransformer(IdentityDagWalker):
                     coefficient, variable = self._coefficient_variable_pair(summand)
                     summands.append(
                         self._manager.Times(
-                            self._manager.Real(coefficient * factor),
+                            self._real(coefficient * factor),
                             variable,
                         )
                     )
@@ -147,65 +144,94 @@ class NormalFormTransformer(IdentityDagWalker):
             variable = factor
 
         if variable == None:
-            return self._manager.Real(coefficient)
+            return self._real(coefficient)
 
-        return self._manager.Times(self._manager.Real(coefficient), variable)
+        return self._manager.Times(self._real(coefficient), variable)
 
     def walk_symbol(self, formula, args, **kwargs):
         if not formula.symbol_type().is_real_type():
             return super().walk_symbol(formula, args, **kwargs)
 
-        return self._manager.Times(self._manager.Real(1), formula)
+        return self._manager.Times(self._real(1), formula)
 
-    def _inequality_constants_right(self, operator, args) -> FNode:
-        left = args[0]
-        right = args[1]
-        intermediate_left = self.walk_minus(
-            self._manager.Minus(left, right), [left, right]
+    def _inequality_constants_right(self, formula, operator, args) -> FNode:
+        # The difference of both sides is summed up directly, without walking a Minus node
+        intermediate_left = self.walk_plus(
+            formula, self._difference_summands(formula, args[0], args[1])
         )
 
         if intermediate_left.is_real_constant():
             return operator(
-                self._manager.Real(0),
-                self._manager.Real(-1 * intermediate_left.constant_value()),
+                self._real(0),
+                self._real(-1 * intermediate_left.constant_value()),
             )
 
-        new_right = self._manager.Real(0)
+        new_right = self._real(0)
         new_left = intermediate_left
         if intermediate_left.is_plus() and intermediate_left.arg(0).is_real_constant():
-            new_right = self._manager.Real(
-                -1 * intermediate_left.arg(0).constant_value()
-            )
+            new_right = self._real(-1 * intermediate_left.arg(0).constant_value())
             new_left = self._manager.Plus(*intermediate_left.args()[1:])
 
         return operator(new_left, new_right)
 
+    def _difference_summands(
+        self, formula: FNode, minuend: FNode, subtrahend: FNode
+    ) -> List[FNode]:
+        node_type = subtrahend.node_type()
+        if node_type == REAL_CONSTANT or node_type == SYMBOL or node_type == TIMES:
+            return [minuend, self._flip_sign(subtrahend)]
+
+        if node_type != PLUS:
+            raise self._not_lra_error(formula)
+
+        summands = [minuend]
+        summands.extend(self._flip_sign(summand) for summand in subtrahend.args())
+        return summands
+
     def _not_lra_error(self, formula):
         return ValueError(f"Formula {formula} is not of type linear real arithmetic")
 
     def _flip_sign(self, formula: FNode):
         if formula.is_symbol():
-            return self._manager.Times(self._manager.Real(-1), formula)
+            return self._manager.Times(self._real(-1), formula)
 
         if formula.is_real_constant():
-            return self._manager.Real(-1 * Fraction(formula.constant_value()))
+            return self._real(-1 * self._constant(formula))
 
         assert formula.is_times()
         coefficient, variable = self._coefficient_variable_pair(formula)
         return self._manager.Times(
-            self._manager.Real(-1 * coefficient),
+            self._real(-1 * coefficient),
             variable,
         )
 
     def _coefficient_variable_pair(
         self, multiplication: FNode
     ) -> Tuple[Fraction, FNode]:
-        assert multiplication.is_times()
-        coefficient = multiplication.arg(0)
-        variable = multiplication.arg(1)
-        assert coefficient.is_real_constant()
-        assert variable.is_symbol()
-        return Fraction(coefficient.constant_value()), variable
+        pair = self._coefficient_variable_pairs.get(multiplication)
+        if pair is None:
+            assert multiplication.is_times()
+            coefficient = multiplication.arg(0)
+            variable = multiplication.arg(1)
+            assert coefficient.is_real_constant()
+            assert variable.is_symbol()
+            pair = (self._constant(coefficient), variable)
+            self._coefficient_variable_pairs[multiplication] = pair
+        return pair
+
+    def _real(self, value: Fraction) -> FNode:
+        node = self._reals.get(value)
+        if node is None:
+            node = self._manager.Real(value)
+            self._reals[value] = node
+        return node
+
+    def _constant(self, constant: FNode) -> Fraction:
+        value = self._constants.get(constant)
+        if value is None:
+            value = Fraction(constant.constant_value())
+            self._constants[constant] = value
+        return value
 
 
 class Simplifier(NormalFormTransformer):
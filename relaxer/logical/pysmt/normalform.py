@@ -1,18 +1,92 @@
-from typing import FrozenSet
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Set
 import pysmt.fnode
 import pysmt.operators
+from pysmt.operators import AND, BOOL_CONSTANT, NOT, OR
 import pysmt.oracles
 import pysmt.shortcuts
 import pysmt.walkers
 
 
+# The node types, which the NNFTransformer does not handle with walk_identity
+_REWRITTEN_NODE_TYPES = frozenset((AND, OR, NOT))
+
+
+def _absorption_index(
+    literal_sets: Iterable[FrozenSet[pysmt.fnode.FNode]],
+) -> Dict[pysmt.fnode.FNode, Set[FrozenSet[pysmt.fnode.FNode]]]:
+    """Indexes the literal sets of the arguments of a junction by one of their literals.
+
+    A literal set can only be absorbed by a proper subset, which contains the literal it is indexed by.
+    Therefore only the sets indexed by the literals of a set have to be checked.
+    """
+    index: Dict[pysmt.fnode.FNode, Set[FrozenSet[pysmt.fnode.FNode]]] = defaultdict(set)
+    for literal_set in literal_sets:
+        index[next(iter(literal_set))].add(literal_set)
+    return index
+
+
+def _is_absorbed(
+    literal_set: FrozenSet[pysmt.fnode.FNode],
+    index: Dict[pysmt.fnode.FNode, Set[FrozenSet[pysmt.fnode.FNode]]],
+) -> bool:
+    for literal in literal_set:
+        for other_literal_set in index.get(literal, ()):
+            if other_literal_set < literal_set:
+                return True
+    return False
+
+
+def _distributed_literal_sets(
+    args: Iterable[pysmt.fnode.FNode], nested_junctions: List[pysmt.fnode.FNode]
+) -> List[FrozenSet[pysmt.fnode.FNode]]:
+    """Distributes a junction over all of its nested junctions at once.
+
+    Every literal set contains the arguments, which are no nested junction, and one argument of each nested
+    junction. Literal sets with complementary literals and absorbed literal sets are dropped.
+    """
+    nested = set(nested_junctions)
+    literal_sets = {frozenset(arg for arg in args if arg not in nested)}
+    for nested_junction in nested_junctions:
+        distributed = set()
+        for literal_set in literal_sets:
+            negated = {literal.arg(0) for literal in literal_set if literal.is_not()}
+            for nested_arg in nested_junction.args():
+                if nested_arg in negated or (
+                    nested_arg.is_not() and nested_arg.arg(0) in literal_set
+                ):
+                    continue
+                distributed.add(literal_set | {nested_arg})
+
+        absorption_index = _absorption_index(distributed)
+        literal_sets = {
+            literal_set
+            for literal_set in distributed
+            if not _is_absorbed(literal_set, absorption_index)
+        }
+
+    return list(literal_sets)
+
+
 class NNFTransformer(pysmt.walkers.DagWalker):
-    def __init__(self) -> None:
+    def __init__(self, check_equivalence: bool = True) -> None:
+        """Initialize the transformer.
+
+        Args:
+            check_equivalence (bool, optional): If true, the transformed formula is checked for equivalence with the input using the smt solver. Defaults to True.
+        """
         super().__init__()
+        self._check_equivalence = check_equivalence
         self._atoms = set()
         self._is_in_normal_form = False
         self._runs = 0
 
+        # The walk functions indexed by node type, for the dispatch in _process_stack
+        self._walk_functions = [
+            self.functions.get(node_type, self.walk_error)
+            for node_type in range(max(pysmt.operators.ALL_TYPES) + 1)
+        ]
+
     @property
     def _manager(self):
         return self.env.formula_manager
@@ -32,50 +106,71 @@ class NNFTransformer(pysmt.walkers.DagWalker):
             out_formula = self.walk(out_formula)
             self._runs += 1
 
-        assert pysmt.shortcuts.is_valid(pysmt.shortcuts.Iff(out_formula, formula))
+        if self._check_equivalence:
+            assert pysmt.shortcuts.is_valid(pysmt.shortcuts.Iff(out_formula, formula))
 
         return out_formula
 
+    def _process_stack(self, **kwargs):
+        if kwargs:
+            return super()._process_stack(**kwargs)
+
+        # Same traversal as the DagWalker, but without keyword arguments the formulas are their own
+        # memoization keys, so the children and the walk function are looked up directly.
+        # Only junctions and negations are rewritten, all other formulas are kept without visiting
+        # their subterms.
+        stack = self.stack
+        memoization = self.memoization
+        walk_functions = self._walk_functions
+        while stack:
+            was_expanded, formula = stack.pop()
+            if was_expanded:
+                if formula not in memoization:
+                    args = [memoization[child] for child in formula.args()]
+                    walk = walk_functions[formula.node_type()]
+                    memoization[formula] = walk(formula, args=args)
+                continue
+
+            if formula.node_type() not in _REWRITTEN_NODE_TYPES:
+                memoization[formula] = formula
+                continue
+
+            stack.append((True, formula))
+            for child in formula.args():
+                if child not in memoization:
+                    stack.append((False, child))
+
     def walk_and(self, formula, args, **kwargs):
         conjuncts = []
+        args_set = set(args)
 
-        literal_sets = set(
-            (
-                frozenset(clause.args()) if clause.is_or() else frozenset([clause])
-                for clause in args
-            )
+        absorption_index = _absorption_index(
+            frozenset(clause.args())
+            if clause.node_type() == OR
+            else frozenset([clause])
+            for clause in args_set
         )
 
-        for arg in set(args):
-            if arg.is_and():
-                for nested_arg in arg.args():
-                    conjuncts.append(nested_arg)
+        for arg in args_set:
+            node_type = arg.node_type()
+            if node_type == AND:
+                conjuncts.extend(arg.args())
                 continue
 
-            if arg.is_or():
-                literal_set = frozenset(arg.args())
-                absorpted = False
-                for other_literal_set in literal_sets:
-                    if literal_set == other_literal_set:
-                        continue
-                    if literal_set.issuperset(other_literal_set):
-                        absorpted = True
-                        break
-
-                if absorpted:
+            if node_type == OR:
+                if _is_absorbed(frozenset(arg.args()), absorption_index):
                     continue
 
-            if arg.is_not():
-                negated = arg.arg(0)
-                if negated in args:
+            elif node_type == NOT:
+                if arg.args()[0] in args_set:
                     # contradiction
                     return self._manager.FALSE()
 
-            if arg.is_false():
-                # contradiction
-                return self._manager.FALSE()
+            elif node_type == BOOL_CONSTANT:
+                if not arg.constant_value():
+                    # contradiction
+                    return self._manager.FALSE()
 
-            if arg.is_true():
                 # identity
                 continue
 
@@ -88,50 +183,40 @@ class NNFTransformer(pysmt.walkers.DagWalker):
 
     def walk_or(self, formula, args, **kwargs):
         disjuncts = []
+        args_set = set(args)
 
-        literal_sets = set(
-            (
-                frozenset(term.args()) if term.is_and() else frozenset([term])
-                for term in args
-            )
+        absorption_index = _absorption_index(
+            frozenset(term.args()) if term.node_type() == AND else frozenset([term])
+            for term in args_set
         )
 
-        for arg in set(args):
-            if arg.is_or():
-                for nested_arg in arg.args():
-                    disjuncts.append(nested_arg)
+        for arg in args_set:
+            node_type = arg.node_type()
+            if node_type == OR:
+                disjuncts.extend(arg.args())
                 continue
 
-            if arg.is_and():
-                literal_set = frozenset(arg.args())
-                absorpted = False
-                for other_literal_set in literal_sets:
-                    if literal_set == other_literal_set:
-                        continue
-                    if literal_set.issuperset(other_literal_set):
-                        absorpted = True
-                        break
-
-                if absorpted:
+            if node_type == AND:
+                if _is_absorbed(frozenset(arg.args()), absorption_index):
                     continue
 
-            if arg.is_not():
-                negated = arg.arg(0)
-                if negated in args:
+            elif node_type == NOT:
+                if arg.args()[0] in args_set:
                     # tautology
                     return self._manager.TRUE()
 
-            if arg.is_true():
-                return self._manager.TRUE()
+            elif node_type == BOOL_CONSTANT:
+                if arg.constant_value():
+                    return self._manager.TRUE()
 
-            if arg.is_false():
                 # identity
                 continue
 
             disjuncts.append(arg)
 
         if len(disjuncts) == 0:
-            return self._manager.TRUE()
+            # identity of the disjunction, e.g. all disjuncts were contradictions
+            return self._manager.FALSE()
 
         return self._manager.Or(disjuncts)
 
@@ -182,8 +267,8 @@ class NNFTransformer(pysmt.walkers.DagWalker):
 
 
 class CNFTransformer(NNFTransformer):
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, check_equivalence: bool = True) -> None:
+        super().__init__(check_equivalence)
 
     def walk_and(self, formula, args, **kwargs):
         transformed = super().walk_and(formula, args, **kwargs)
@@ -202,22 +287,16 @@ class CNFTransformer(NNFTransformer):
             return preprocessed
 
         # push disjunctions "back"
-        nested_conjunction = None
-        disjuncts = set()
-        for arg in preprocessed.args():
-            if arg.is_and():
-                nested_conjunction = arg
-            disjuncts.add(arg)
+        nested_conjunctions = [arg for arg in preprocessed.args() if arg.is_and()]
 
-        if nested_conjunction is not None:
+        if len(nested_conjunctions) > 0:
             self._is_in_normal_form = False
-            conjuncts = set()
-            for arg in nested_conjunction.args():
-                conjuncts.add(
-                    self._manager.Or(
-                        disjuncts.difference({nested_conjunction}).union({arg})
-                    )
+            conjuncts = {
+                self._manager.Or(literal_set)
+                for literal_set in _distributed_literal_sets(
+                    preprocessed.args(), nested_conjunctions
                 )
+            }
 
             return self._manager.And(conjuncts)
 
@@ -225,8 +304,8 @@ class CNFTransformer(NNFTransformer):
 
 
 class DNFTransformer(NNFTransformer):
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, check_equivalence: bool = True) -> None:
+        super().__init__(check_equivalence)
 
     def walk_or(self, formula, args, **kwargs):
         transformed = super().walk_or(formula, args, **kwargs)
@@ -245,22 +324,16 @@ class DNFTransformer(NNFTransformer):
             return preprocessed
 
         # push conjunctions "back"
-        nested_disjunction = None
-        conjuncts = set()
-        for arg in preprocessed.args():
-            if arg.is_or():
-                nested_disjunction = arg
-            conjuncts.add(arg)
+        nested_disjunctions = [arg for arg in preprocessed.args() if arg.is_or()]
 
-        if nested_disjunction is not None:
+        if len(nested_disjunctions) > 0:
             self._is_in_normal_form = False
-            disjuncts = set()
-            for arg in nested_disjunction.args():
-                disjuncts.add(
-                    self._manager.And(
-                        conjuncts.difference({nested_disjunction}).union({arg})
-                    )
+            disjuncts = {
+                self._manager.And(literal_set)
+                for literal_set in _distributed_literal_sets(
+                    preprocessed.args(), nested_disjunctions
                 )
+            }
 
             return self._manager.Or(disjuncts)
 
@@ -1,12 +1,20 @@
+import hashlib
 import json
+import os
+from pathlib import Path
+import tempfile
 import time
 from collections import defaultdict
-from typing import Any, Dict, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from io import StringIO
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
 import warnings
 
 import pysmt.fnode
 import pysmt.oracles
 import pysmt.shortcuts
+from pysmt.smtlib.parser import SmtLibParser
+from pysmt.smtlib.script import smtlibscript_from_formula
 
 from relaxer import performance
 from relaxer.logical.constraint_system import TimedRelaxedTraceConstraints
@@ -24,19 +32,30 @@ from relaxer.io import DumpLocation, DumpLocationHandler
 class QuantifierEliminator:
     """Class to build a DNF formula from a trace iterator by eliminating the quantifiers from the trace constraints."""
 
+    # The pysmt quantifier eliminator, which eliminates the quantifiers of the trace constraints
+    _qelim_solver_name = "msat_fm"
+
     def __init__(
         self,
         dump_handler: DumpLocationHandler,
         debug: bool = False,
+        jobs: int = 1,
+        cache_path: Optional[Path] = None,
     ) -> None:
         """Initialize the quantifier eliminator.
 
         Args:
             dump_handler (DumpLocationHandler): Dump location handler.
             debug (bool, optional): If true, intermediate results are checked for equivalence using the smt solver. Defaults to False.
+            jobs (int, optional): Number of worker processes eliminating the quantifiers of the traces. Defaults to 1, which processes the traces in this process.
+            cache_path (Optional[Path], optional): Directory in which the quantifier free formulas are cached across runs. Defaults to None, which disables the cache.
         """
         self._debug = debug
-        self._runtimes: Dict[str, float] = defaultdict(lambda: 0.0)
+        self._jobs = jobs
+        self._cache = (
+            None if cache_path is None else QuantifierEliminationCache(cache_path)
+        )
+        self._runtimes: Dict[str, float] = defaultdict(float)
 
         self._trace_dump_loc = dump_handler.create_dump_location("trace")
         self._trace_formula_dump_loc = dump_handler.create_dump_location(
@@ -73,7 +92,39 @@ class QuantifierEliminator:
         """
         timed_iterator = performance.TimedIterator(trace_iterator)
 
-        formulas = set()
+        traces = self._unique_traces(timed_iterator)
+        if self._jobs > 1:
+            formulas = self._eliminate_in_workers(traces)
+        else:
+            formulas = set()
+            for w, trace_constraints in traces:
+                formula, qe_runtime, processing_runtime = self._eliminate(
+                    w, trace_constraints
+                )
+                formulas.add(formula)
+                self._runtimes["quantifier_elimination"] += qe_runtime
+                self._runtimes["processing"] += processing_runtime
+
+        self._runtimes["trace_generation"] += timed_iterator.iter_runtime
+
+        dnf_formula, runtime = performance.process_timeit(
+            self._convert_to_dnf, formulas
+        )
+        self._runtimes["processing"] += runtime
+
+        self._result_dnf_formula_dump_loc.write_dump(
+            "qf_free_dnf_formula.txt", f"{dnf_formula}\n"
+        )
+
+        return dnf_formula
+
+    def _unique_traces(
+        self, timed_iterator: performance.TimedIterator
+    ) -> Iterator[Tuple[int, TimedRelaxedTraceConstraints]]:
+        """Dumps the generated traces and yields the ones whose constraints were not seen before."""
+        # Traces with the same constraints result in the same quantifier free formula
+        seen_constraints = set()
+        self._duplicate_traces = 0
 
         for w, trace_constraints in enumerate(timed_iterator):
             self._width = w + 1
@@ -83,31 +134,84 @@ class QuantifierEliminator:
             self._trace_dump_loc.write_dump(
                 f"{w}.json", json.dumps(trace_constraints.to_json())
             )
-            qe_input = self._convert_to_pysmt(w, trace_constraints)
-            self._runtimes["processing"] += QuantifierEliminator._timer() - start
 
-            qf, runtime = performance.process_timeit(
-                self._eliminate_quantifiers, w, qe_input
+            key = (
+                trace_constraints.all_inequalities,
+                trace_constraints.all_property_formulas,
+                trace_constraints.delta_variables,
             )
-            self._runtimes["quantifier_elimination"] += runtime
-
-            start = QuantifierEliminator._timer()
-            formula = self._post_process(w, qf)
-            formulas.add(formula)
+            duplicate = key in seen_constraints
+            seen_constraints.add(key)
             self._runtimes["processing"] += QuantifierEliminator._timer() - start
 
-        self._runtimes["trace_generation"] += timed_iterator.iter_runtime
+            if duplicate:
+                self._duplicate_traces += 1
+                continue
 
-        dnf_formula, runtime = performance.process_timeit(
-            self._convert_to_dnf, formulas
-        )
-        self._runtimes["processing"] += runtime
+            yield w, trace_constraints
 
-        self._result_dnf_formula_dump_loc.write_dump(
-            "qf_free_dnf_formula.txt", f"{dnf_formula}\n"
+    def _eliminate(
+        self, w: int, trace_constraints: TimedRelaxedTraceConstraints
+    ) -> Tuple[pysmt.fnode.FNode, float, float]:
+        """Eliminates the quantifiers of the trace constraints.
+
+        Returns:
+            Tuple[pysmt.fnode.FNode, float, float]: The quantifier free formula, the quantifier elimination runtime and the processing runtime.
+        """
+        start = QuantifierEliminator._timer()
+        qe_input = self._convert_to_pysmt(w, trace_constraints)
+        processing_runtime = QuantifierEliminator._timer() - start
+
+        qf, qe_runtime = performance.process_timeit(
+            self._eliminate_quantifiers, w, qe_input
         )
 
-        return dnf_formula
+        start = QuantifierEliminator._timer()
+        formula = self._post_process(w, qf)
+        processing_runtime += QuantifierEliminator._timer() - start
+
+        return formula, qe_runtime, processing_runtime
+
+    def _eliminate_in_workers(
+        self, traces: Iterable[Tuple[int, TimedRelaxedTraceConstraints]]
+    ) -> Set[pysmt.fnode.FNode]:
+        """Eliminates the quantifiers of the traces in a pool of worker processes.
+
+        The traces are generated in this process, since the trace iterator is sequential. The quantifier
+        elimination of a trace is independent of all other traces, so the traces are distributed over the
+        workers. The formulas are sent back as SMT-LIB scripts, because pysmt formulas are bound to the
+        environment of their process.
+        """
+        formulas = set()
+        # Bounds the number of traces that wait for a worker
+        max_pending = 2 * self._jobs
+        pending: Set["Future[Tuple[str, float, float]]"] = set()
+
+        def collect(future: "Future[Tuple[str, float, float]]"):
+            script, qe_runtime, processing_runtime = future.result()
+            start = QuantifierEliminator._timer()
+            formulas.add(SmtLibParser().get_script(StringIO(script)).get_last_formula())
+            self._runtimes["processing"] += QuantifierEliminator._timer() - start
+            self._runtimes["quantifier_elimination"] += qe_runtime
+            self._runtimes["processing"] += processing_runtime
+
+        with ProcessPoolExecutor(
+            max_workers=self._jobs,
+            initializer=_initialize_worker,
+            initargs=(self,),
+        ) as executor:
+            for w, trace_constraints in traces:
+                if len(pending) >= max_pending:
+                    # Collect whichever traces are done, so a slow trace does not block the others
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+                pending.add(executor.submit(_eliminate_in_worker, w, trace_constraints))
+
+            for future in wait(pending).done:
+                collect(future)
+
+        return formulas
 
     @property
     def stats(self) -> Dict[str, Any]:
@@ -118,6 +222,7 @@ class QuantifierEliminator:
         """
         d = {f"{s}_runtime_s": runtime for s, runtime in self._runtimes.items()}
         d["number_of_traces"] = self._width
+        d["number_of_duplicate_traces"] = self._duplicate_traces
         return d
 
     @staticmethod
@@ -125,16 +230,18 @@ class QuantifierEliminator:
         return time.process_time()
 
     def _convert_to_dnf(self, formulas: Iterable[pysmt.fnode.FNode]) -> DNFFormula:
-        conjunction = CNFTransformer().transform(pysmt.shortcuts.And(*formulas))
+        # The formulas are already in CNF after the post processing, so their clauses form a CNF
+        conjunction = _conjunction_of_cnfs(formulas)
 
-        rip_output = propagate_real_intervals_cnf(conjunction)
-        formula = CNFTransformer().transform(rip_output)  # In order to absorpt clauses
+        rip_output = propagate_real_intervals_cnf(conjunction, self._debug)
+        # In order to absorpt clauses
+        formula = CNFTransformer(self._debug).transform(rip_output)
 
         QuantifierEliminator._smt2_dump(
             self._result_cnf_formula_dump_loc, "result_cnf", formula
         )
 
-        dnf_formula = DNFTransformer().transform(formula)
+        dnf_formula = DNFTransformer(self._debug).transform(formula)
 
         if self._debug:
             assert pysmt.shortcuts.is_valid(
@@ -144,13 +251,13 @@ class QuantifierEliminator:
         return dnf_from_pysmt(dnf_formula)
 
     def _post_process(self, w: int, qf: pysmt.fnode.FNode) -> pysmt.fnode.FNode:
-        rip_input = CNFTransformer().transform(qf)
+        rip_input = CNFTransformer(self._debug).transform(qf)
         if self._debug:
             assert pysmt.shortcuts.is_valid(pysmt.shortcuts.Iff(qf, rip_input))
 
         QuantifierEliminator._smt2_dump(self._rip_input_dump_loc, f"{w}", rip_input)
 
-        rip_output = propagate_real_intervals_cnf(rip_input)
+        rip_output = propagate_real_intervals_cnf(rip_input, False)
         if self._debug:
             assert pysmt.shortcuts.is_valid(pysmt.shortcuts.Iff(rip_input, rip_output))
 
@@ -161,14 +268,21 @@ class QuantifierEliminator:
     def _eliminate_quantifiers(
         self, w: int, qe_input: pysmt.fnode.FNode
     ) -> pysmt.fnode.FNode:
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            qfree = pysmt.shortcuts.qelim(qe_input, solver_name="msat_fm")
-
-        if not pysmt.oracles.QuantifierOracle().is_qf(qfree):
-            raise RuntimeError(
-                "Quantifier elimination failed. Returned formula is not quantifier free!"
-            )
+        qfree = None if self._cache is None else self._cache.get(qe_input)
+        if qfree is None:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                qfree = pysmt.shortcuts.qelim(
+                    qe_input, solver_name=self._qelim_solver_name
+                )
+
+            if not pysmt.oracles.QuantifierOracle().is_qf(qfree):
+                raise RuntimeError(
+                    "Quantifier elimination failed. Returned formula is not quantifier free!"
+                )
+
+            if self._cache is not None:
+                self._cache.put(qe_input, qfree)
 
         QuantifierEliminator._smt2_dump(self._qe_output_dump_loc, f"{w}", qfree)
 
@@ -191,3 +305,108 @@ class QuantifierEliminator:
         loc.write_dump(
             f"{name}.smt2", pysmt.shortcuts.to_smtlib(formula, daggify=False)
         )
+
+
+def _conjunction_of_cnfs(
+    cnf_formulas: Iterable[pysmt.fnode.FNode],
+) -> pysmt.fnode.FNode:
+    clauses = set()
+    for cnf_formula in cnf_formulas:
+        if cnf_formula.is_and():
+            clauses.update(cnf_formula.args())
+        elif cnf_formula.is_false():
+            return pysmt.shortcuts.FALSE()
+        elif not cnf_formula.is_true():
+            clauses.add(cnf_formula)
+
+    return pysmt.shortcuts.And(clauses)
+
+
+class QuantifierEliminationCache:
+    """Persistent cache of quantifier free formulas, which are stored as SMT-LIB scripts in a directory.
+
+    A formula is looked up by a hash of its canonical form, in which the arguments of conjunctions,
+    disjunctions and sums are sorted. The order of these arguments depends on the hashes of the
+    constraints, which differ between runs.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def get(self, formula: pysmt.fnode.FNode) -> Optional[pysmt.fnode.FNode]:
+        """Returns the cached quantifier free formula of the given formula or None if it is not cached."""
+        try:
+            with open(self._entry_path(formula), "r") as f:
+                return SmtLibParser().get_script(f).get_last_formula()
+        except FileNotFoundError:
+            return None
+
+    def put(self, formula: pysmt.fnode.FNode, qfree: pysmt.fnode.FNode) -> None:
+        """Caches the quantifier free formula of the given formula."""
+        # Concurrent workers may write the same entry, so it is replaced atomically
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            smtlibscript_from_formula(qfree).serialize(f, daggify=True)
+        os.replace(tmp_path, self._entry_path(formula))
+
+    def _entry_path(self, formula: pysmt.fnode.FNode) -> Path:
+        key = hashlib.blake2b(_canonical_string(formula).encode()).hexdigest()
+        return self.path / f"{key}.smt2"
+
+
+def _canonical_string(formula: pysmt.fnode.FNode) -> str:
+    strings: Dict[pysmt.fnode.FNode, str] = {}
+    stack = [(formula, False)]
+    while len(stack) > 0:
+        node, expanded = stack.pop()
+        if node in strings:
+            continue
+
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((arg, False) for arg in node.args() if arg not in strings)
+            continue
+
+        args = [strings[arg] for arg in node.args()]
+        if node.is_and() or node.is_or() or node.is_plus():
+            args.sort()
+
+        if node.is_symbol():
+            strings[node] = node.symbol_name()
+        elif node.is_constant():
+            strings[node] = str(node.constant_value())
+        elif node.is_quantifier():
+            variables = " ".join(
+                sorted(v.symbol_name() for v in node.quantifier_vars())
+            )
+            strings[node] = f"({node.node_type()} ({variables}) {args[0]})"
+        else:
+            strings[node] = f"({node.node_type()} {' '.join(args)})"
+
+    return strings[formula]
+
+
+# The quantifier eliminator of a worker process, which is set by the pool initializer
+_worker_eliminator: Optional[QuantifierEliminator] = None
+
+
+def _initialize_worker(eliminator: QuantifierEliminator):
+    global _worker_eliminator
+    _worker_eliminator = eliminator
+
+
+def _eliminate_in_worker(
+    w: int, trace_constraints: TimedRelaxedTraceConstraints
+) -> Tuple[str, float, float]:
+    assert _worker_eliminator is not None
+    formula, qe_runtime, processing_runtime = _worker_eliminator._eliminate(
+        w, trace_constraints
+    )
+
+    start = QuantifierEliminator._timer()
+    script = StringIO()
+    smtlibscript_from_formula(formula).serialize(script, daggify=False)
+    processing_runtime += QuantifierEliminator._timer() - start
+
+    return script.getvalue(), qe_runtime, processing_runtime
@@ -1,8 +1,7 @@
-from dataclasses import dataclass
 from fractions import Fraction
 from math import inf
 from numbers import Real
-from typing import Dict, Optional, Set, Tuple
+from typing import Dict, Iterable, NamedTuple, Optional, Set, Tuple
 
 import pysmt.shortcuts
 from pysmt.fnode import FNode
@@ -14,29 +13,36 @@ from relaxer.logical.pysmt.conversion import (
 )
 
 
-def propagate_real_intervals_cnf(cnf_formula: FNode) -> FNode:
+def propagate_real_intervals_cnf(
+    cnf_formula: FNode, check_equivalence: bool = True
+) -> FNode:
     atoms = pysmt.shortcuts.get_atoms(cnf_formula)
 
     if cnf_formula.is_not() or not cnf_formula.is_bool_op():
         return cnf_formula
 
     if cnf_formula.is_or():
-        return _rewrite_clause(cnf_formula, {}, atoms)[0]
+        return _rewrite_clause(cnf_formula, {}, atoms, _Literals())[0]
 
     if not cnf_formula.is_and():
         raise ValueError(f"Formula not in CNF: {cnf_formula}")
 
-    clauses = set(cnf_formula.args())
+    clauses = list(dict.fromkeys(cnf_formula.args()))
     unit_intervals = {}
+    linear_sums = _linear_sums(atoms)
+    literals = _Literals()
 
     changed_clause = True
     while changed_clause:
-        rewritten_clauses = set()
-        _add_unit_intervals(unit_intervals, clauses, atoms)
-        _add_implied_intervals(unit_intervals, atoms)
+        _add_unit_intervals(unit_intervals, clauses, atoms, literals)
+        _add_implied_intervals(unit_intervals, linear_sums)
         changed_clause = False
+        # The rewritten clauses are compacted in place, satisfied clauses are dropped
+        n_clauses = 0
         for clause in clauses:
-            rewritten_clause, changed = _rewrite_clause(clause, unit_intervals, atoms)
+            rewritten_clause, changed = _rewrite_clause(
+                clause, unit_intervals, atoms, literals
+            )
             changed_clause = changed_clause or changed
 
             if rewritten_clause.is_false():
@@ -44,27 +50,29 @@ def propagate_real_intervals_cnf(cnf_formula: FNode) -> FNode:
             if rewritten_clause.is_true():
                 continue
 
-            rewritten_clauses.add(rewritten_clause)
+            clauses[n_clauses] = rewritten_clause
+            n_clauses += 1
 
-        clauses = rewritten_clauses
+        del clauses[n_clauses:]
 
-    out_cnf = pysmt.shortcuts.And(clauses)
-    assert pysmt.shortcuts.is_valid(pysmt.shortcuts.Iff(out_cnf, cnf_formula))
+    # Different clauses can be rewritten to the same clause
+    out_cnf = pysmt.shortcuts.And(list(dict.fromkeys(clauses)))
+    if check_equivalence and out_cnf is not cnf_formula:
+        assert pysmt.shortcuts.is_valid(pysmt.shortcuts.Iff(out_cnf, cnf_formula))
     return out_cnf
 
 
-@dataclass
-class Bound:
+class Bound(NamedTuple):
     value: Real
     is_strict: bool
 
 
 class Interval:
     def __init__(
-        self, upper: Bound = Bound(inf, False), lower: Bound = Bound(-inf, False)  # type: ignore
+        self, upper: Optional[Bound] = None, lower: Optional[Bound] = None
     ) -> None:
-        self._upper = upper
-        self._lower = lower
+        self._upper = upper if upper is not None else Bound(inf, False)
+        self._lower = lower if lower is not None else Bound(-inf, False)
 
     @property
     def upper(self) -> Bound:
@@ -103,8 +111,38 @@ class Interval:
         return f"{lower_c}{self.lower.value}, {self.upper.value}{upper_c}"
 
 
+class _Literals:
+    """Caches the inequality triples and bounds of the literals, which are rewritten until a fixpoint is reached."""
+
+    def __init__(self) -> None:
+        self._triples: Dict[FNode, Tuple[FNode, InequalitySymbol, FNode]] = {}
+        self._bounds: Dict[FNode, Optional[Tuple[FNode, Bound, bool]]] = {}
+
+    def triple(self, literal: FNode) -> Tuple[FNode, InequalitySymbol, FNode]:
+        triple = self._triples.get(literal)
+        if triple is None:
+            triple = get_inequality_triple(literal)
+            self._triples[literal] = triple
+        return triple
+
+    def bound(self, literal: FNode) -> Optional[Tuple[FNode, Bound, bool]]:
+        """Returns the bound of a literal or None if no side of the literal is constant."""
+        try:
+            return self._bounds[literal]
+        except KeyError:
+            left, op, right = self.triple(literal)
+            bound = None
+            if left.is_constant() or right.is_constant():
+                bound = _get_bound(left, op, right)
+            self._bounds[literal] = bound
+            return bound
+
+
 def _add_unit_intervals(
-    unit_intervals: Dict[FNode, Interval], clauses: Set[FNode], atoms: Set[FNode]
+    unit_intervals: Dict[FNode, Interval],
+    clauses: Iterable[FNode],
+    atoms: Set[FNode],
+    literals: _Literals,
 ) -> None:
     for clause in clauses:
         if clause.is_or() or clause.is_true():
@@ -117,12 +155,13 @@ def _add_unit_intervals(
         if atom not in atoms:
             raise ValueError(f"Formula is not in CNF, got clause: {clause}")
 
-        left, op, right = get_inequality_triple(clause)
+        literal_bound = literals.bound(clause)
 
         variables: FNode
         bound: Bound
         is_lower: bool
-        if not (left.is_constant() or right.is_constant()):
+        if literal_bound is None:
+            left, op, right = literals.triple(clause)
             if left in unit_intervals:
                 var_to_add = right
                 bound_var = left
@@ -152,7 +191,7 @@ def _add_unit_intervals(
             if is_strict:
                 bound = Bound(bound.value, True)
         else:
-            variables, bound, is_lower = _get_bound(left, op, right)
+            variables, bound, is_lower = literal_bound
 
         if variables not in unit_intervals:
             unit_intervals[variables] = Interval()
@@ -163,9 +202,13 @@ def _add_unit_intervals(
             unit_intervals[variables].tighten_upper(bound)
 
 
-def _add_implied_intervals(
-    unit_intervals: Dict[FNode, Interval], atoms: Set[FNode]
-) -> None:
+def _linear_sums(atoms: Set[FNode]) -> Dict[FNode, Tuple[Tuple[FNode, Real], ...]]:
+    """Extracts the summands of the sums, which are bounded by a constant in an atom.
+
+    Returns:
+        Dict[FNode, Tuple[Tuple[FNode, Real], ...]]: The variables and coefficients of the summands by sum.
+    """
+    linear_sums = {}
     for atom in atoms:
         left, _, right = get_inequality_triple(atom)
         if not (left.is_constant() or right.is_constant()):
@@ -175,16 +218,11 @@ def _add_implied_intervals(
         if left.is_constant():
             variables = right
 
-        if not variables.is_plus():
+        if not variables.is_plus() or variables in linear_sums:
             continue
 
-        summands = variables.args()
-        skip = False
-        interval = Interval(
-            upper=Bound(0.0, False), lower=Bound(0.0, False)  # type: ignore
-        )
-
-        for summand in summands:
+        summands = []
+        for summand in variables.args():
             coefficient = 1
 
             if summand.is_times():
@@ -198,6 +236,23 @@ def _add_implied_intervals(
             if coefficient == 0:
                 break
 
+            summands.append((summand, coefficient))
+
+        linear_sums[variables] = tuple(summands)
+
+    return linear_sums
+
+
+def _add_implied_intervals(
+    unit_intervals: Dict[FNode, Interval],
+    linear_sums: Dict[FNode, Tuple[Tuple[FNode, Real], ...]],
+) -> None:
+    for variables, summands in linear_sums.items():
+        skip = False
+        upper_value = lower_value = 0.0
+        upper_is_strict = lower_is_strict = False
+
+        for summand, coefficient in summands:
             if summand not in unit_intervals:
                 skip = True
                 break
@@ -208,32 +263,30 @@ def _add_implied_intervals(
             up = summand_interval.upper.value * coefficient
 
             if low <= up:
-                interval.upper.value += up
-                interval.lower.value += low
-                interval.upper.is_strict = (
-                    interval.upper.is_strict or summand_interval.upper.is_strict
-                )
-                interval.lower.is_strict = (
-                    interval.lower.is_strict or summand_interval.lower.is_strict
-                )
+                upper_value += up
+                lower_value += low
+                upper_is_strict = upper_is_strict or summand_interval.upper.is_strict
+                lower_is_strict = lower_is_strict or summand_interval.lower.is_strict
             else:
-                interval.upper.value += low
-                interval.lower.value += up
-                interval.upper.is_strict = (
-                    interval.upper.is_strict or summand_interval.lower.is_strict
-                )
-                interval.lower.is_strict = (
-                    interval.lower.is_strict or summand_interval.upper.is_strict
-                )
+                upper_value += low
+                lower_value += up
+                upper_is_strict = upper_is_strict or summand_interval.lower.is_strict
+                lower_is_strict = lower_is_strict or summand_interval.upper.is_strict
 
         if skip:
             continue
 
-        unit_intervals[variables] = interval
+        unit_intervals[variables] = Interval(
+            upper=Bound(upper_value, upper_is_strict),
+            lower=Bound(lower_value, lower_is_strict),
+        )
 
 
 def _rewrite_clause(
-    clause: FNode, unit_intervals: Dict[FNode, Interval], atoms: Set[FNode]
+    clause: FNode,
+    unit_intervals: Dict[FNode, Interval],
+    atoms: Set[FNode],
+    literals: _Literals,
 ) -> Tuple[FNode, bool]:
     if clause.is_not() and clause.arg(0) in atoms:
         return clause, False
@@ -248,12 +301,12 @@ def _rewrite_clause(
 
     out_literals = set()
     for literal in clause.args():
-        left, op, right = get_inequality_triple(literal)
-        if not (left.is_constant() or right.is_constant()):
+        literal_bound = literals.bound(literal)
+        if literal_bound is None:
             out_literals.add(literal)
             continue
 
-        variables, bound, is_lower = _get_bound(left, op, right)
+        variables, bound, is_lower = literal_bound
 
         if variables in unit_intervals:
             interval = unit_intervals[variables]
@@ -1,24 +1,116 @@
 from numbers import Real
-from typing import Set, Tuple
+from typing import List, Set, Tuple
+
+import numpy as np
+
+_INITIAL_CAPACITY = 16
+_TILE_ROWS = 1024
 
 
 class ParetoSet:
+    """Set of points, which are not dominated by another point of the set.
+
+    The points are kept as a float array as well, so the dominance checks of a new point against all points
+    of the set are done by vectorized comparisons.
+    """
+
     def __init__(self) -> None:
-        self._points: Set[Tuple[Real]] = set()
+        self._points: List[Tuple[Real]] = []
+        self._array = np.empty((0, 0))
 
     def add(self, p: Tuple[Real]):
-        for q in self._points.copy():
-            if dominates(p, q):
-                self._points.remove(q)
-                continue
+        p_array = np.asarray(p, dtype=float)
+        front = self._front(len(p))
+        all_greater_equal = (front >= p_array).all(axis=1)
+        any_greater = (front > p_array).any(axis=1)
+        if (all_greater_equal & any_greater).any():
+            # p is dominated
+            return
+
+        if (all_greater_equal & ~any_greater).any() and p in self._points:
+            # p is already in the set
+            return
 
-            if dominates(q, p):
-                return
+        self._remove(~all_greater_equal & ~any_greater)
+        self._append(p_array[np.newaxis], [p])
+
+    def add_batch(self, points: np.ndarray):
+        """Adds the rows of an array as points. The result is the same as adding the rows one by one as tuples.
+
+        Args:
+            points (np.ndarray): Array of shape (number of points, dimension)
+        """
+        batch = np.unique(points[~dominated_rows(points)], axis=0)
+
+        front = self._front(points.shape[1])
+        # [i, j] compares point i of the set with row j of the batch
+        all_greater_equal = (front[:, np.newaxis] >= batch[np.newaxis]).all(axis=2)
+        any_greater = (front[:, np.newaxis] > batch[np.newaxis]).any(axis=2)
+        dominated = (all_greater_equal & any_greater).any(axis=0)
+        equal = (all_greater_equal & ~any_greater).any(axis=0)
+
+        rows = []
+        batch_points = []
+        for row, is_dominated, is_equal in zip(batch, dominated, equal):
+            if is_dominated:
+                continue
+            point = tuple(row)
+            if is_equal and point in self._points:
+                continue
+            rows.append(row)
+            batch_points.append(point)
 
-        self._points.add(p)
+        self._remove((~all_greater_equal & ~any_greater).any(axis=1))
+        if len(batch_points) > 0:
+            self._append(np.array(rows), batch_points)
 
     def to_set(self) -> Set[Tuple[Real]]:
-        return self._points
+        return set(self._points)
+
+    def _front(self, dimension: int) -> np.ndarray:
+        if len(self._points) == 0:
+            self._array = np.empty((_INITIAL_CAPACITY, dimension))
+        return self._array[: len(self._points)]
+
+    def _remove(self, dominated: np.ndarray):
+        if dominated.any():
+            keep = ~dominated
+            self._points = [q for q, kept in zip(self._points, keep) if kept]
+            self._array[: len(self._points)] = self._array[: len(keep)][keep]
+
+    def _append(self, rows: np.ndarray, points: List[Tuple[Real]]):
+        n = len(self._points)
+        capacity = len(self._array)
+        if n + len(points) > capacity:
+            while n + len(points) > capacity:
+                capacity *= 2
+            array = np.empty((capacity, self._array.shape[1]))
+            array[:n] = self._array[:n]
+            self._array = array
+
+        self._array[n : n + len(points)] = rows
+        self._points.extend(points)
+
+
+def dominated_rows(points: np.ndarray) -> np.ndarray:
+    """Returns which rows of an array are dominated by another row of the array.
+
+    The pairwise comparisons are done in tiles of rows, so the memory stays linear in the number of rows.
+
+    Args:
+        points (np.ndarray): Array of shape (number of points, dimension)
+
+    Returns:
+        np.ndarray: Boolean array, True at index i if row i is dominated
+    """
+    dominated = np.zeros(len(points), dtype=bool)
+    for start in range(0, len(points), _TILE_ROWS):
+        tile = points[start : start + _TILE_ROWS]
+        # [i, j] compares row i of the tile with row j of the array
+        all_greater_equal = (tile[:, np.newaxis] >= points[np.newaxis]).all(axis=2)
+        any_greater = (tile[:, np.newaxis] > points[np.newaxis]).any(axis=2)
+        dominated |= (all_greater_equal & any_greater).any(axis=0)
+    return dominated
 
 
 def dominates(p: Tuple[Real], q: Tuple[Real]) -> bool:
@@ -31,6 +123,10 @@ def dominates(p: Tuple[Real], q: Tuple[Real]) -> bool:
     Returns:
         bool: True if p dominates q
     """
-    return all(p_c >= q_c for p_c, q_c in zip(p, q)) and any(
-        p_c > q_c for p_c, q_c in zip(p, q)
-    )
+    strictly_greater = False
+    for p_c, q_c in zip(p, q):
+        if p_c < q_c:
+            return False
+        if p_c > q_c:
+            strictly_greater = True
+    return strictly_greater
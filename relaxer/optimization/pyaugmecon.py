@@ -16,7 +16,11 @@ from relaxer.logical.lra import (
     RelaxationVariable,
     Variable,
 )
-from relaxer.io import DumpLocationHandler, EmptyDumpLocationHandler
+from relaxer.io import (
+    DumpLocationHandler,
+    EmptyDumpLocation,
+    EmptyDumpLocationHandler,
+)
 from relaxer.optimization.pareto import ParetoSet
 from relaxer.optimization import pycddlib
 
@@ -30,6 +34,9 @@ class Optimizer:
     ) -> None:
         self._grid_points = grid_points
         self._model_dump = dump_handler.create_dump_location("pyaugmecon_input")
+        self._trivial_optimizer = pycddlib.Optimizer(
+            grid_points, EmptyDumpLocationHandler()
+        )
         self._logs_dir = Path("/dev/null")
         if pyaugmecon_logging_folder is not None:
             pyaugmecon_logging_folder.mkdir(parents=True, exist_ok=True)
@@ -73,6 +80,7 @@ class Optimizer:
 
             model.constraints = pyo.ConstraintList()
 
+            float_epsilon = float(strict_epsilon)
             for ineq in conj_constraints:
                 factor = 1.0
                 if (
@@ -81,19 +89,20 @@ class Optimizer:
                 ):
                     factor = -1.0
 
-                s = sum(
+                s = pyo.quicksum(
                     (
-                        float(summand.coefficient) * var_to_pyo_var[summand.var]
+                        factor
+                        * float(summand.coefficient)
+                        * var_to_pyo_var[summand.var]
                         for summand in ineq.left.summands
                     )
                 )
 
-                offset = Fraction(0)
-
+                rhs = float(ineq.right)
                 if ineq.is_strict:
-                    offset = strict_epsilon
+                    rhs -= float_epsilon
 
-                model.constraints.add(s * factor <= ineq.right - float(offset))
+                model.constraints.add(s <= rhs)
 
             model.obj_list = pyo.ObjectiveList()
             for i, objective in enumerate(objectives):
@@ -105,10 +114,10 @@ class Optimizer:
             for _, entry in enumerate(model.obj_list):
                 model.obj_list[entry].deactivate()  # type: ignore
 
-            dump_str = ""
-            string_io = StringIO(dump_str)
-            model.pprint(string_io)
-            self._model_dump.write_dump(f"{i}.txt", string_io.getvalue())
+            if not isinstance(self._model_dump, EmptyDumpLocation):
+                string_io = StringIO()
+                model.pprint(string_io)
+                self._model_dump.write_dump(f"{i}.txt", string_io.getvalue())
 
             nadir_points = [0 for _ in range(len(model.obj_list) - 1)]
 
@@ -142,8 +151,7 @@ class Optimizer:
         strict_epsilon: Fraction,
         i: int,
     ) -> Collection[Tuple[Real]]:
-        opt = pycddlib.Optimizer(self._grid_points, EmptyDumpLocationHandler())
-        solutions, _ = opt.maximize_con_relaxation(
+        solutions, _ = self._trivial_optimizer.maximize_con_relaxation(
             objectives, conj_constraints, strict_epsilon, i
         )
 
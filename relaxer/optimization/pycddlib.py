@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from fractions import Fraction
 from math import inf
 from numbers import Real
@@ -7,22 +8,60 @@ import cdd
 import numpy as np
 
 from relaxer.logical.lra import DNFFormula, Inequality, RelaxationVariable
-from relaxer.optimization.pareto import ParetoSet, dominates
+from relaxer.optimization.pareto import ParetoSet, dominated_rows
 from relaxer.optimization.scipy import ScalarizationOptimizer
-from relaxer.io import DumpLocationHandler
+from relaxer.io import DumpLocationHandler, EmptyDumpLocation
 
 _V_FORMAT_TYPE_IDX = 0
 _V_FORMAT_RAY_TYPE = 0
 _V_FORMAT_VERTEX_TYPE = 1
+_CDD_CACHE_SIZE = 1024
+_CDD_NUMBER_TYPES = ("fraction", "float")
 
 
 class Optimizer:
-    def __init__(self, grid_points: int, dump_handler: DumpLocationHandler) -> None:
+    def __init__(
+        self,
+        grid_points: int,
+        dump_handler: DumpLocationHandler,
+        number_type: str = "fraction",
+    ) -> None:
+        """Initialize the optimizer.
+
+        Args:
+            grid_points (int): Number of points sampled on each edge of a polyhedron.
+            dump_handler (DumpLocationHandler): Handler for the dumps of the polyhedra.
+            number_type (str, optional): Arithmetic of cdd. "fraction" is exact, "float" is faster but may give wrong vertices for degenerate polyhedra due to rounding. Defaults to "fraction".
+        """
+        if number_type not in _CDD_NUMBER_TYPES:
+            raise ValueError(f"Unknown cdd number type {number_type}")
+
         self.grid_points = grid_points
+        self._number_type = number_type
         self._input_dump_location = dump_handler.create_dump_location("pycddlib_input")
         self._output_dump_location = dump_handler.create_dump_location(
             "pycddlib_output"
         )
+        # Polyhedra are only converted to strings if the dumps are written somewhere
+        self._dump = not (
+            isinstance(self._input_dump_location, EmptyDumpLocation)
+            and isinstance(self._output_dump_location, EmptyDumpLocation)
+        )
+        # Constraint matrices of the terms of the current optimization, terms of a DNF often repeat
+        self._A_b_cache: Dict[
+            Tuple[FrozenSet[Inequality], Fraction], Tuple[np.ndarray, np.ndarray]
+        ] = {}
+        # Generators and adjacency of polyhedra by their H-representation, together with the dumps
+        self._cdd_cache: OrderedDict[
+            Tuple[Tuple[Fraction, ...], ...],
+            Tuple[
+                str,
+                str,
+                Sequence[Tuple[Real]],
+                Sequence[Tuple[Real]],
+                Sequence[FrozenSet[int]],
+            ],
+        ] = OrderedDict()
 
     def maximize_con_relaxation(
         self,
@@ -33,9 +72,12 @@ class Optimizer:
     ) -> Tuple[Set[Tuple[Real]], bool]:
         output = ParetoSet()
 
-        self._maximize_conj_constraints(
-            objectives, strict_epsilon, 0, conj_constraints, output
-        )
+        try:
+            self._maximize_conj_constraints(
+                objectives, strict_epsilon, 0, conj_constraints, output
+            )
+        finally:
+            self._A_b_cache.clear()
 
         return output.to_set(), True
 
@@ -53,14 +95,17 @@ class Optimizer:
             )
 
         output = ParetoSet()
-        for term_idx, conj_constraints in enumerate(constraints.terms):
-            self._maximize_conj_constraints(
-                objectives,
-                strict_epsilon,
-                term_idx,
-                conj_constraints,
-                output,
-            )
+        try:
+            for term_idx, conj_constraints in enumerate(constraints.terms):
+                self._maximize_conj_constraints(
+                    objectives,
+                    strict_epsilon,
+                    term_idx,
+                    conj_constraints,
+                    output,
+                )
+        finally:
+            self._A_b_cache.clear()
 
         return output.to_set(), False
 
@@ -87,36 +132,27 @@ class Optimizer:
             output.add(tuple(np.zeros(n_objectives) + unbounded_mask))
             return
 
-        dominated = [False for _ in vertices]
+        vertex_array = np.array(vertices, dtype=float)
+        masked_vertices = vertex_array + unbounded_mask
+        dominated = dominated_rows(masked_vertices)
 
-        for i, v1 in enumerate(vertices):
-            for j, v2 in enumerate(vertices):
-                if i == j:
-                    continue
-                v1_array = np.array(v1) + unbounded_mask
-                v2_array = np.array(v2) + unbounded_mask
-                if dominates(tuple(v2_array), tuple(v1_array)):
-                    dominated[i] = True
-                    break
+        output.add_batch(masked_vertices[~dominated])
 
-        thetas = np.linspace(1, 0, self.grid_points).reshape((1, self.grid_points))
+        thetas = np.linspace(1, 0, self.grid_points).reshape((self.grid_points, 1))
 
-        for i, v in enumerate(vertices):
-            if dominated[i]:
+        for i in np.flatnonzero(~dominated):
+            neighbours = [
+                j
+                for j in adjacency[i]
+                if j < len(vertices) and j > i and not dominated[j]
+            ]
+            if len(neighbours) == 0:
                 continue
 
-            output.add(tuple(np.array(v) + unbounded_mask))
-            for j in adjacency[i]:
-                if j >= len(vertices) or j <= i or dominated[j]:
-                    continue
-
-                np_adj_v = np.reshape(np.array(vertices[j]), (n_objectives, 1))
-                np_v = np.reshape(np.array(v), (n_objectives, 1))
-
-                line_segment = np_v * thetas + np_adj_v * (1 - thetas)
-                for point in line_segment.T:
-                    to_add = point + unbounded_mask
-                    output.add(tuple(to_add))
+            # [k, l] is the l-th grid point on the edge from vertex i to its k-th neighbour
+            ends = vertex_array[neighbours, np.newaxis]
+            line_segments = vertex_array[i] * thetas + ends * (1 - thetas)
+            output.add_batch(line_segments.reshape((-1, n_objectives)) + unbounded_mask)
 
     def _get_polygon_surfaces(
         self,
@@ -125,16 +161,46 @@ class Optimizer:
         strict_epsilon: Fraction,
         i: int,
     ) -> Tuple[Sequence[Tuple[Real]], Sequence[Tuple[Real]], Sequence[FrozenSet[int]]]:
-        A, b = ScalarizationOptimizer._to_A_b(
-            objectives, conj_constraints, strict_epsilon
-        )
+        A, b = self._to_A_b(objectives, conj_constraints, strict_epsilon)
+
+        h_representation = np.insert(-A, 0, b, axis=1)
+        # Different inequalities can give the same row, e.g. "x >= 1" and "-x <= -1"
+        first_rows: Dict[Tuple[Fraction, ...], int] = {}
+        for row_idx, row in enumerate(map(tuple, h_representation)):
+            first_rows.setdefault(row, row_idx)
+        key = tuple(first_rows)
+        h_representation = h_representation[list(first_rows.values())]
+        cached = self._cdd_cache.get(key)
+        if cached is None:
+            cached = self._enumerate_generators(h_representation)
+            self._cdd_cache[key] = cached
+            if len(self._cdd_cache) > _CDD_CACHE_SIZE:
+                self._cdd_cache.popitem(last=False)
+        else:
+            self._cdd_cache.move_to_end(key)
+
+        poly_str, ext_str, vertices, rays, adjacency = cached
+        if self._dump:
+            self._input_dump_location.write_dump(f"{i}.txt", poly_str)
+            self._output_dump_location.write_dump(f"{i}.txt", ext_str)
+        return vertices, rays, adjacency
 
-        mat = cdd.Matrix(np.insert(-A, 0, b, axis=1), number_type="fraction")
+    def _enumerate_generators(
+        self, h_representation: np.ndarray
+    ) -> Tuple[
+        str,
+        str,
+        Sequence[Tuple[Real]],
+        Sequence[Tuple[Real]],
+        Sequence[FrozenSet[int]],
+    ]:
+        if self._number_type == "float":
+            h_representation = h_representation.astype(float)
+        mat = cdd.Matrix(h_representation, number_type=self._number_type)
         mat.rep_type = cdd.RepType.INEQUALITY
         poly = cdd.Polyhedron(mat)
-        self._input_dump_location.write_dump(f"{i}.txt", str(poly))
+        poly_str = str(poly) if self._dump else ""
         ext = poly.get_generators()
-        self._output_dump_location.write_dump(f"{i}.txt", str(ext))
         vertices = []
         rays = []
         for row in ext:
@@ -144,7 +210,31 @@ class Optimizer:
                 rays.append(row[_V_FORMAT_TYPE_IDX + 1 :])
 
         adjacency = poly.get_adjacency()
-        return vertices, rays, adjacency
+        ext_str = str(ext) if self._dump else ""
+        return poly_str, ext_str, vertices, rays, adjacency
+
+    def _to_A_b(
+        self,
+        objectives: Sequence[RelaxationVariable],
+        conj_constraints: Collection[Inequality],
+        strict_epsilon: Fraction,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # The objectives are fixed during an optimization, so the constraints determine the matrices
+        key = (frozenset(conj_constraints), strict_epsilon)
+        cached = self._A_b_cache.get(key)
+        if cached is None:
+            A, b = ScalarizationOptimizer._to_A_b(
+                ScalarizationOptimizer._variable_indices(objectives),
+                conj_constraints,
+                strict_epsilon,
+                exact=True,
+            )
+            cached = (A.copy(), b.copy())
+            self._A_b_cache[key] = cached
+            return A, b
+
+        A, b = cached
+        return A.copy(), b.copy()
 
     def _get_unbounded_mask(self, objectives, rays):
         unbounded_mask = np.zeros(len(objectives))
@@ -17,11 +17,28 @@ from relaxer.logical.lra import (
 )
 from relaxer.optimization.pareto import ParetoSet
 
+# Factors which turn an inequality into the form "ax <= b"
+_SYMBOL_FACTORS = {
+    InequalitySymbol.GreaterThan: -1,
+    InequalitySymbol.LessThan: 1,
+    InequalitySymbol.GreaterEqual: -1,
+    InequalitySymbol.LessEqual: 1,
+}
+_STRICT_SYMBOLS = frozenset((InequalitySymbol.GreaterThan, InequalitySymbol.LessThan))
+
 
 class ScalarizationOptimizer:
     def __init__(self, weights: Sequence[Sequence[float]]) -> None:
         # we use a dict for weights because its keys behaves like an ordered set
         self._weights = [tuple(weight_vector) for weight_vector in weights]
+        dimension = len(self._weights[0]) if len(self._weights) > 0 else 0
+        if any(len(weight_vector) != dimension for weight_vector in self._weights):
+            raise ValueError("All weight vectors must have the same length")
+
+        # Cost vectors of linprog, which minimizes, one per row
+        self._negated_weights = -np.array(self._weights, dtype=np.float64).reshape(
+            (len(self._weights), dimension)
+        )
 
     def maximize_relaxation(
         self,
@@ -30,11 +47,22 @@ class ScalarizationOptimizer:
         strict_epsilon: Fraction,
     ) -> Tuple[Set[Tuple[Real]], bool]:
 
+        # Terms share many inequalities, so each distinct inequality becomes one row of a common matrix
+        inequality_rows: Dict[Inequality, int] = {}
+        for conj_constraints in constraints.terms:
+            for inequality in conj_constraints:
+                inequality_rows.setdefault(inequality, len(inequality_rows))
+
+        A, b = ScalarizationOptimizer._to_A_b(
+            ScalarizationOptimizer._variable_indices(objectives),
+            list(inequality_rows),
+            strict_epsilon,
+        )
+
         solutions = ParetoSet()
         for conj_constraints in constraints.terms:
-            self._maximize_con_relaxation(
-                conj_constraints, objectives, strict_epsilon, solutions
-            )
+            rows = [inequality_rows[inequality] for inequality in conj_constraints]
+            self._maximize_con_relaxation(A[rows], b[rows], solutions)
 
         return solutions.to_set(), False
 
@@ -45,11 +73,15 @@ class ScalarizationOptimizer:
         strict_epsilon: Fraction,
     ) -> Tuple[Set[Tuple[Real]], bool]:
 
-        solutions = ParetoSet()
-        self._maximize_con_relaxation(
-            conj_constraints, objectives, strict_epsilon, solutions
+        A, b = ScalarizationOptimizer._to_A_b(
+            ScalarizationOptimizer._variable_indices(objectives),
+            conj_constraints,
+            strict_epsilon,
         )
 
+        solutions = ParetoSet()
+        self._maximize_con_relaxation(A, b, solutions)
+
         return solutions.to_set(), False
 
     @property
@@ -61,27 +93,33 @@ class ScalarizationOptimizer:
         return "Disjunctive weighted sum"
 
     def _maximize_con_relaxation(
-        self,
-        conj_constraints: Collection[Inequality],
-        objectives: Sequence[RelaxationVariable],
-        strict_epsilon: Fraction,
-        solutions: ParetoSet,
+        self, A: np.ndarray, b: np.ndarray, solutions: ParetoSet
     ) -> None:
-        A, b = ScalarizationOptimizer._to_A_b(
-            objectives, conj_constraints, strict_epsilon
-        )
+        # Rows without coefficients are the same for all weights, they are either redundant or infeasible
+        zero_rows = ~A.any(axis=1)
+        if (b[zero_rows] < 0).any():
+            return
+        A = A[~zero_rows]
+        b = b[~zero_rows]
 
         mask_vector, addition_vector = self._bounded_vectors(A)
-        if np.array_equal(mask_vector, np.zeros(len(objectives))):
+        if not mask_vector.any():
             # All variables unbounded
-            return set([tuple(addition_vector)])  # type: ignore
-
-        for weight_vector in self._weights:
-            c = -1.0 * np.array(weight_vector) * mask_vector
-            if np.array_equal(c, np.zeros(len(objectives))):
-                continue
-
-            res = linprog(c, A_ub=A, b_ub=b)
+            solutions.add(tuple(addition_vector))
+            return
+
+        if len(mask_vector) == 1:
+            self._maximize_univariate(A, b, solutions)
+            return
+
+        optima = []
+        costs = self._negated_weights * mask_vector
+        for c in costs[costs.any(axis=1)]:
+            # The relaxation variables are free. Their non-negativity must be part of the
+            # constraints, as in the relax_i >= 0 rows that trace_constraints_to_pysmt adds to
+            # every DNF term. Callers of maximize_con_relaxation that pass constraints without
+            # these rows get a different LP than with the default bounds of (0, None).
+            res = linprog(c, A_ub=A, b_ub=b, bounds=(None, None), method="highs")
 
             if not res.success:
                 if res.status == 2:
@@ -93,68 +131,70 @@ class ScalarizationOptimizer:
 
                 raise RuntimeError(f"Unsuccessful optimization: {res.message}")
 
-            x = tuple(res.x + addition_vector)
+            optima.append(res.x)
 
-            solutions.add(x)
+        if len(optima) > 0:
+            solutions.add_batch(np.array(optima) + addition_vector)
+
+    def _maximize_univariate(
+        self, A: np.ndarray, b: np.ndarray, solutions: ParetoSet
+    ) -> None:
+        # The constraints a * x <= b of a single variable form an interval, the LPs are solved at its ends
+        column = A[:, 0]
+        ratios = b / column
+        upper = ratios[column > 0].min()
+        lower = ratios[column < 0].max(initial=-inf)
+        if lower > upper:
+            # Problem infeasible
+            return
+
+        costs = self._negated_weights[:, 0]
+        if (costs < 0).any():
+            solutions.add((upper,))
+        if (costs > 0).any() and lower > -inf:
+            solutions.add((lower,))
 
     @staticmethod
-    def _to_A_b(
+    def _variable_indices(
         objectives: Sequence[RelaxationVariable],
+    ) -> Dict[Variable, int]:
+        return {var: var.relaxation_idx for var in objectives}
+
+    @staticmethod
+    def _to_A_b(
+        var_to_idx: Dict[Variable, int],
         inequalities: Collection[Inequality],
         strict_epsilon: Fraction,
+        exact: bool = False,
     ) -> Tuple[np.ndarray, np.ndarray]:
-        var_to_idx: Dict[Variable, int] = {
-            var: var.relaxation_idx for var in objectives
-        }
+        # Fraction entries are only needed by exact solvers, float arrays avoid object arithmetic
+        number = Fraction if exact else float
+        dtype = object if exact else np.float64
 
         n = len(inequalities)
-        m = len(objectives)
-        A = np.zeros((n, m), dtype=Fraction)
-        b = np.zeros(n, dtype=Fraction)
+        m = len(var_to_idx)
+        A = np.zeros((n, m), dtype=dtype)
+        b = np.zeros(n, dtype=dtype)
+        epsilon = number(strict_epsilon)
+        factors = {symbol: number(factor) for symbol, factor in _SYMBOL_FACTORS.items()}
 
         for i, inequality in enumerate(inequalities):
-            factor = Fraction(1.0)
-            if (
-                inequality.symbol == InequalitySymbol.GreaterEqual
-                or inequality.symbol == InequalitySymbol.GreaterThan
-            ):
-                factor = Fraction(-1.0)
+            symbol = inequality.symbol
+            factor = factors[symbol]
 
-            offset = Fraction(0)
-
-            if inequality.is_strict:
-                offset = strict_epsilon
-
-            b[i] = inequality.right * factor - offset
+            right = number(inequality.right) * factor
+            if symbol in _STRICT_SYMBOLS:
+                right -= epsilon
+            b[i] = right
 
             for summand in inequality.left.summands:
-                idx = var_to_idx[summand.var]
-
-                A[i][idx] = A[i][idx] + factor * summand.coefficient
+                A[i, var_to_idx[summand.var]] += factor * number(summand.coefficient)
 
         return A, b
 
     def _bounded_vectors(self, A: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        unbounded_idxs = []
-        _, m = A.shape
-        for idx in range(m):
-            bounded = False
-            for coeff in A[:, idx]:
-                if coeff > 0:
-                    bounded = True
-                    break
-
-            if not bounded:
-                unbounded_idxs.append(idx)
-
-        if len(unbounded_idxs) == m:
-            return np.zeros(m), inf * np.ones(m)
-
-        mask_vector = np.ones(m)
-        addition_vector = np.zeros(m)
-
-        for idx in unbounded_idxs:
-            mask_vector[idx] = 0
-            addition_vector[idx] = inf
-
+        # A variable is bounded from above if it has a positive coefficient in a constraint
+        bounded = (A > 0).any(axis=0)
+        mask_vector = bounded.astype(np.float64)
+        addition_vector = np.where(bounded, 0.0, inf)
         return mask_vector, addition_vector
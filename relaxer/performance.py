@@ -1,10 +1,15 @@
 from collections import defaultdict
 import re
 import time
-from typing import Any, Callable, Iterator, Tuple, TypeVar
+from typing import Any, Callable, Dict, Iterator, Tuple, TypeVar
+import weakref
 
 
 _runtimes = defaultdict(float)
+# Runtimes of the timed methods by the id of the instance. The id does not keep the instance alive and
+# works for unhashable instances, the entries are removed when the instance is collected, before its id
+# can be reused.
+_method_runtimes: Dict[int, Dict[str, float]] = {}
 
 
 def time_method(method: Callable):
@@ -18,7 +23,7 @@ def time_method(method: Callable):
         start = time.process_time()
         result = method(self, *args, **kwargs)
         end = time.process_time()
-        _runtimes[(self, method.__name__)] = end - start
+        _instance_runtimes(self)[method.__name__] = end - start
         return result
 
     return timed
@@ -51,7 +56,17 @@ def get_method_runtime(self: object, method_name: str) -> float:
     Returns:
         float: Runtime of the method call. If the method was not called before, 0 is returned.
     """
-    return _runtimes[(self, method_name)]
+    return _method_runtimes.get(id(self), {}).get(method_name, 0.0)
+
+
+def _instance_runtimes(self: object) -> Dict[str, float]:
+    key = id(self)
+    runtimes = _method_runtimes.get(key)
+    if runtimes is None:
+        runtimes = {}
+        _method_runtimes[key] = runtimes
+        weakref.finalize(self, _method_runtimes.pop, key, None)
+    return runtimes
 
 
 def get_function_runtime(func_name: str) -> float:
@@ -1,8 +1,9 @@
 from abc import ABC
 from dataclasses import dataclass
-from enum import Enum
+from enum import IntEnum
 from numbers import Real
-from typing import FrozenSet, Optional
+from typing import FrozenSet, Optional, Tuple
+from weakref import WeakValueDictionary
 
 
 class Expression(ABC):
@@ -30,16 +31,19 @@ class SafetyPropertyAtom(Expression):
     pass
 
 
-class Operator(Enum):
-    GreaterThan = ">"
-    LessThan = "<"
-    GreaterEqual = ">="
-    LessEqual = "<="
-    Equal = "=="
-    NotEqual = "!="
+class Operator(IntEnum):
+    GreaterThan = 0
+    LessThan = 1
+    GreaterEqual = 2
+    LessEqual = 3
+    Equal = 4
+    NotEqual = 5
 
     def __str__(self) -> str:
-        return self.value
+        return _OPERATOR_TOKENS[self]
+
+
+_OPERATOR_TOKENS = (">", "<", ">=", "<=", "==", "!=")
 
 
 @dataclass(frozen=True)
@@ -53,6 +57,30 @@ class Clock:
             prefix = f"{self.process}."
         return f"{prefix}{self.name}"
 
+    @staticmethod
+    def interned(name: str, process: Optional[str] = None) -> "Clock":
+        """Returns the clock with the given name and process. Equal clocks that are alive at the same
+        time are represented by the same object.
+
+        Args:
+            name (str): The name of the clock
+            process (Optional[str], optional): The process of a local clock. Defaults to None.
+
+        Returns:
+            Clock: The interned clock
+        """
+        key = (name, process)
+        clock = _INTERNED_CLOCKS.get(key)
+        if clock is None:
+            clock = Clock(name, process)
+            _INTERNED_CLOCKS[key] = clock
+        return clock
+
+
+_INTERNED_CLOCKS: "WeakValueDictionary[Tuple[str, Optional[str]], Clock]" = (
+    WeakValueDictionary()
+)
+
 
 @dataclass(frozen=True)
 class ClockConstraint(SafetyPropertyAtom):
@@ -71,6 +99,38 @@ class ClockConstraint(SafetyPropertyAtom):
             suffix = f" \u00B1 rel_{self.relaxation_idx}"
         return f"{self.clock} {self.operator} {self.limit}{suffix}"
 
+    @staticmethod
+    def interned(
+        clock: Clock,
+        operator: Operator,
+        limit: Real,
+        relaxation_idx: Optional[int] = None,
+    ) -> "ClockConstraint":
+        """Returns the clock constraint with the given components. Equal clock constraints that are
+        alive at the same time are represented by the same object.
+
+        Args:
+            clock (Clock): The constrained clock
+            operator (Operator): The comparison operator
+            limit (Real): The limit the clock is compared with
+            relaxation_idx (Optional[int], optional): The index of the relaxation of the constraint. Defaults to None.
+
+        Returns:
+            ClockConstraint: The interned clock constraint
+        """
+        key = (clock, operator, limit, relaxation_idx)
+        constraint = _INTERNED_CLOCK_CONSTRAINTS.get(key)
+        if constraint is None:
+            constraint = ClockConstraint(clock, operator, limit, relaxation_idx)
+            _INTERNED_CLOCK_CONSTRAINTS[key] = constraint
+        return constraint
+
+
+# The keys only reference the components, so unused clock constraints are released
+_INTERNED_CLOCK_CONSTRAINTS: "WeakValueDictionary[Tuple[Clock, Operator, Real, Optional[int]], ClockConstraint]" = (
+    WeakValueDictionary()
+)
+
 
 @dataclass(frozen=True)
 class Edge:
@@ -0,0 +1,108 @@
+from pathlib import Path
+import tempfile
+import unittest
+
+from pysmt.shortcuts import GE, LE, And, Exists, Iff, Plus, Real, Symbol, is_valid
+from pysmt.typing import REAL
+
+from relaxer.io import EmptyDumpLocationHandler
+from relaxer.logical.constraint_system import TimedRelaxedTraceConstraints
+from relaxer.logical.lra import DeltaVariable, Inequality, RelaxationVariable
+from relaxer.logical.pysmt.quantifier import (
+    QuantifierEliminationCache,
+    QuantifierEliminator,
+)
+
+
+class _Z3QuantifierEliminator(QuantifierEliminator):
+    # MathSAT is not needed to test the distribution of the traces
+    _qelim_solver_name = "z3"
+
+
+def _trace(inequalities, properties, depth=1):
+    return TimedRelaxedTraceConstraints(
+        symbolic_trace=(),
+        relaxation_vars=frozenset((RelaxationVariable(0), RelaxationVariable(1))),
+        delta_variables=tuple(DeltaVariable(i) for i in range(depth)),
+        inequalities=(frozenset(map(Inequality.from_string, inequalities)),),
+        property_formulas=(frozenset(map(Inequality.from_string, properties)),),
+    )
+
+
+def _terms(dnf):
+    return set(map(frozenset, dnf.terms))
+
+
+class TestQuantifierEliminator(unittest.TestCase):
+    def setUp(self):
+        self.traces = [
+            _trace(["1.0*delta_0 + -1.0*relax_0 <= 2"], ["1.0*delta_0 <= 5"]),
+            _trace(["1.0*delta_0 + -1.0*relax_1 <= 1"], ["1.0*delta_0 <= 4"]),
+            _trace(
+                ["1.0*delta_0 + -1.0*relax_0 <= 2", "1.0*delta_1 + -1.0*relax_1 <= 3"],
+                ["1.0*delta_0 + 1.0*delta_1 <= 9"],
+                depth=2,
+            ),
+            # Duplicate of the first trace
+            _trace(["1.0*delta_0 + -1.0*relax_0 <= 2"], ["1.0*delta_0 <= 5"]),
+        ]
+
+    def test_workers_match_sequential(self):
+        sequential = _Z3QuantifierEliminator(EmptyDumpLocationHandler(), jobs=1)
+        parallel = _Z3QuantifierEliminator(EmptyDumpLocationHandler(), jobs=2)
+
+        expected = sequential.process(iter(self.traces))
+        actual = parallel.process(iter(self.traces))
+
+        self.assertEqual(_terms(actual), _terms(expected))
+        self.assertEqual(
+            parallel.stats["number_of_traces"], sequential.stats["number_of_traces"]
+        )
+        self.assertEqual(parallel.stats["number_of_duplicate_traces"], 1)
+
+
+class TestQuantifierEliminationCache(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.cache = QuantifierEliminationCache(Path(self._directory.name))
+        self.x, self.y, self.d = (
+            Symbol("x", REAL),
+            Symbol("y", REAL),
+            Symbol("d", REAL),
+        )
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _formula(self, limit, reverse=False):
+        conjuncts = [GE(self.d, Real(0)), LE(Plus(self.d, self.x), Real(limit))]
+        if reverse:
+            conjuncts.reverse()
+        return And(Exists([self.d], And(conjuncts)), GE(self.y, Real(0)))
+
+    def test_round_trip(self):
+        qfree = And(LE(self.x, Real(2)), GE(self.y, Real(0)))
+        self.cache.put(self._formula(2), qfree)
+
+        cached = self.cache.get(self._formula(2))
+        self.assertIsNotNone(cached)
+        self.assertTrue(is_valid(Iff(cached, qfree)))
+
+    def test_argument_order_hits(self):
+        qfree = And(LE(self.x, Real(2)), GE(self.y, Real(0)))
+        self.cache.put(self._formula(2), qfree)
+
+        self.assertIsNotNone(self.cache.get(self._formula(2, reverse=True)))
+
+    def test_changed_constraint_misses(self):
+        qfree = And(LE(self.x, Real(2)), GE(self.y, Real(0)))
+        self.cache.put(self._formula(2), qfree)
+
+        self.assertIsNone(self.cache.get(self._formula(3)))
+
+    def test_empty_cache_misses(self):
+        self.assertIsNone(self.cache.get(self._formula(2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,83 +1,102 @@
+import random
 import unittest
 
-from pysmt.shortcuts import And, Not, Or, Symbol
+from pysmt.shortcuts import FALSE, And, Iff, Not, Or, Symbol, is_valid
 
-from relaxer.logical.pysmt.normalform import CNFTransformer, NNFTransformer
+from relaxer.logical.pysmt.normalform import (
+    CNFTransformer,
+    DNFTransformer,
+    NNFTransformer,
+)
 
 
-# TODO: Make assertions independent from ordering
-class TestNNFTransformer(unittest.TestCase):
+def _unordered(formula):
+    """Returns a representation of the formula, which ignores the order of the arguments of junctions."""
+    if formula.is_and() or formula.is_or():
+        return (
+            formula.node_type(),
+            frozenset(_unordered(arg) for arg in formula.args()),
+        )
+    return formula
+
+
+class UnorderedAssertions:
+    def assertEqualUnordered(self, first, second):
+        self.assertEqual(_unordered(first), _unordered(second), f"{first} != {second}")
+
+
+class TestNNFTransformer(unittest.TestCase, UnorderedAssertions):
     def test_not(self):
         a = Symbol("a")
         formula = Not(Not(a))
         sut = NNFTransformer()
         nnf = sut.transform(formula)
-        self.assertEquals(nnf, a)
+        self.assertEqualUnordered(nnf, a)
 
     def test_and(self):
         a, b, c = Symbol("a"), Symbol("b"), Symbol("c")
         formula = Not(And(a, b, c))
         sut = NNFTransformer()
         nnf = sut.transform(formula)
-        self.assertEquals(nnf, Or(Not(a), Not(b), Not(c)))
+        self.assertEqualUnordered(nnf, Or(Not(a), Not(b), Not(c)))
 
     def test_or(self):
         a, b, c = Symbol("a"), Symbol("b"), Symbol("c")
         formula = Not(Or(a, b, c))
         sut = NNFTransformer()
         nnf = sut.transform(formula)
-        self.assertEquals(nnf, And(Not(a), Not(b), Not(c)))
+        self.assertEqualUnordered(nnf, And(Not(a), Not(b), Not(c)))
 
     def test_nested_or_and(self):
         a, b, c = Symbol("a"), Symbol("b"), Symbol("c")
         formula = Not(Or(a, And(b, c)))
         sut = NNFTransformer()
         nnf = sut.transform(formula)
-        self.assertEquals(nnf, And(Not(a), Or(Not(b), Not(c))))
+        self.assertEqualUnordered(nnf, And(Not(a), Or(Not(b), Not(c))))
 
     def test_nested_and_or(self):
         a, b, c = Symbol("a"), Symbol("b"), Symbol("c")
         formula = Not(And(a, Or(b, c)))
         sut = NNFTransformer()
         nnf = sut.transform(formula)
-        self.assertEquals(nnf, Or(Not(a), And(Not(b), Not(c))))
+        self.assertEqualUnordered(nnf, Or(Not(a), And(Not(b), Not(c))))
 
 
-class TestCNFTransformer(unittest.TestCase):
+class TestCNFTransformer(unittest.TestCase, UnorderedAssertions):
     def test_not(self):
         a = Symbol("a")
         formula = Not(Not(a))
         sut = CNFTransformer()
         cnf = sut.transform(formula)
-        self.assertEquals(cnf, a)
+        self.assertEqualUnordered(cnf, a)
 
     def test_not_and(self):
         a, b, c = Symbol("a"), Symbol("b"), Symbol("c")
         formula = Not(And(a, b, c))
         sut = CNFTransformer()
         cnf = sut.transform(formula)
-        self.assertEquals(cnf, Or(Not(a), Not(b), Not(c)))
+        self.assertEqualUnordered(cnf, Or(Not(a), Not(b), Not(c)))
 
     def test__not_or(self):
         a, b, c = Symbol("a"), Symbol("b"), Symbol("c")
         formula = Not(Or(a, b, c))
         sut = CNFTransformer()
         cnf = sut.transform(formula)
-        self.assertEquals(cnf, And(Not(a), Not(b), Not(c)))
+        self.assertEqualUnordered(cnf, And(Not(a), Not(b), Not(c)))
 
     def test_nested_or_and(self):
         a, b, c = Symbol("a"), Symbol("b"), Symbol("c")
         formula = Not(Or(a, And(b, c)))
         sut = CNFTransformer()
         cnf = sut.transform(formula)
-        self.assertEquals(cnf, And(Not(a), Or(Not(b), Not(c))))
+        self.assertEqualUnordered(cnf, And(Not(a), Or(Not(b), Not(c))))
 
     def test_nested_and_or(self):
         a, b, c = Symbol("a"), Symbol("b"), Symbol("c")
         formula = Not(And(a, Or(b, c)))
         sut = CNFTransformer()
         cnf = sut.transform(formula)
-        self.assertEquals(cnf, And(Or(Not(a), Not(c)), Or(Not(a), Not(b))))
+        self.assertEqualUnordered(cnf, And(Or(Not(a), Not(c)), Or(Not(a), Not(b))))
 
     def test_dnf(self):
         a, b, c, d = Symbol("a"), Symbol("b"), Symbol("c"), Symbol("d")
@@ -85,7 +104,58 @@ class TestCNFTransformer(unittest.TestCase):
         sut = CNFTransformer()
         cnf = sut.transform(formula)
         print(cnf.get_type())
-        self.assertEquals(cnf, And(Or(a, c), Or(b, c), Or(a, d), Or(b, d)))
+        self.assertEqualUnordered(cnf, And(Or(a, c), Or(b, c), Or(a, d), Or(b, d)))
+
+
+class TestDNFTransformer(unittest.TestCase, UnorderedAssertions):
+    def test_contradictory_terms(self):
+        a, b = Symbol("a"), Symbol("b")
+        formula = Or(And(a, Not(a)), And(Or(a, b), Not(a), Not(b)))
+        sut = DNFTransformer()
+        dnf = sut.transform(formula)
+        self.assertEqualUnordered(dnf, FALSE())
+
+
+def _random_formula(rng, symbols, depth):
+    if depth == 0 or rng.random() < 0.2:
+        symbol = rng.choice(symbols)
+        return Not(symbol) if rng.random() < 0.4 else symbol
+
+    junction = rng.choice([And, Or, Not])
+    if junction is Not:
+        return Not(_random_formula(rng, symbols, depth - 1))
+    return junction(
+        [_random_formula(rng, symbols, depth - 1) for _ in range(rng.randint(1, 3))]
+    )
+
+
+class TestNormalFormEquivalence(unittest.TestCase):
+    """The normal forms are only checked with the smt solver in debug mode, so they are checked here."""
+
+    def assertEquivalentNormalForms(self, formula):
+        for transformer in (NNFTransformer, CNFTransformer, DNFTransformer):
+            transformed = transformer(check_equivalence=False).transform(formula)
+            self.assertTrue(
+                is_valid(Iff(formula, transformed)),
+                f"{transformer.__name__}: {formula} -> {transformed}",
+            )
+
+    def test_unsatisfiable(self):
+        a, b, c, d = Symbol("a"), Symbol("b"), Symbol("c"), Symbol("d")
+        formula = And(
+            And(Not(And(Or(b, b, Not(a)), And(a, b, d), And(d, a))), a, And(c, Not(d))),
+            And(
+                And(Or(b, c, Not(b)), And(b, c, a), Not(b)),
+                Or(d, Not(And(Not(b), b, Not(a)))),
+            ),
+        )
+        self.assertEquivalentNormalForms(formula)
+
+    def test_random(self):
+        rng = random.Random(0)
+        symbols = [Symbol(name) for name in "ab"]
+        for _ in range(300):
+            self.assertEquivalentNormalForms(_random_formula(rng, symbols, 4))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,28 @@
+import unittest
+
+from relaxer.logical.formula import And, Or
+from relaxer.logical.lra import Inequality
+
+
+class TestJunction(unittest.TestCase):
+    def setUp(self):
+        self.a = Inequality.from_string("1.0*delta_0 <= 1")
+        self.b = Inequality.from_string("1.0*delta_1 <= 2")
+        self.c = Inequality.from_string("1.0*relax_0 < 3")
+
+    def test_equal_regardless_of_order(self):
+        first = And((self.a, self.b, self.c))
+        second = And((self.c, self.a, self.b, self.a))
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+
+    def test_keeps_first_occurrence_order(self):
+        junction = Or((self.c, self.a, self.c, self.b))
+        self.assertEqual(junction.arguments, (self.c, self.a, self.b))
+
+    def test_connectives_differ(self):
+        self.assertNotEqual(And((self.a, self.b)), Or((self.a, self.b)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from relaxer.logical.lra import DeltaVariable, RelaxationVariable, Sum, Summand
+
+
+class TestSum(unittest.TestCase):
+    def test_from_string(self):
+        s = Sum.from_string("1.0*delta_0 + -2.5*relax_1")
+        self.assertEqual(
+            s,
+            Sum(
+                (
+                    Summand(1.0, DeltaVariable(0)),
+                    Summand(-2.5, RelaxationVariable(1)),
+                )
+            ),
+        )
+
+    def test_from_string_round_trip(self):
+        s = Sum((Summand(3.0, RelaxationVariable(2)), Summand(1e20, DeltaVariable(1))))
+        self.assertEqual(Sum.from_string(str(s)), s)
+
+    def test_from_string_empty(self):
+        self.assertTrue(Sum.from_string("0").is_empty)
+
+    def test_from_string_malformed(self):
+        for s in (
+            "garbage",
+            "",
+            "1.0*delta_0 + 2*foo_1",
+            "1.0*delta_0 2*delta_1",
+            "1.0*delta_0 +",
+            "a*delta_0",
+        ):
+            with self.subTest(s=s):
+                with self.assertRaises(ValueError):
+                    Sum.from_string(s)
+
+
+if __name__ == "__main__":
+    unittest.main()
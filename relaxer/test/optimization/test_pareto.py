@@ -0,0 +1,57 @@
+from math import inf
+import random
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from relaxer.optimization import pareto
+from relaxer.optimization.pareto import ParetoSet, dominated_rows, dominates
+
+
+class TestParetoSet(unittest.TestCase):
+    def test_add_dominated(self):
+        sut = ParetoSet()
+        sut.add((1.0, 2.0))
+        sut.add((0.0, 1.0))
+        sut.add((2.0, 2.0))
+        self.assertEqual(sut.to_set(), {(2.0, 2.0)})
+
+    def test_add_batch_equals_add(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            dimension = rng.randint(1, 4)
+            points = [
+                tuple(rng.choice([0.0, 1.0, 2.0, 3.0, inf]) for _ in range(dimension))
+                for _ in range(rng.randint(1, 30))
+            ]
+            # Duplicate rows within a batch
+            points += rng.sample(points, min(3, len(points)))
+
+            expected = ParetoSet()
+            for point in points:
+                expected.add(point)
+
+            actual = ParetoSet()
+            start = 0
+            while start < len(points):
+                stop = start + rng.randint(1, 5)
+                actual.add_batch(np.array(points[start:stop]))
+                start = stop
+
+            self.assertEqual(actual.to_set(), expected.to_set(), points)
+
+    def test_dominated_rows(self):
+        rng = random.Random(1)
+        points = np.array(
+            [[rng.choice([0.0, 1.0, 2.0, inf]) for _ in range(3)] for _ in range(50)]
+        )
+        expected = [any(dominates(tuple(q), tuple(p)) for q in points) for p in points]
+        self.assertEqual(dominated_rows(points).tolist(), expected)
+        # Several tiles of rows
+        with mock.patch.object(pareto, "_TILE_ROWS", 7):
+            self.assertEqual(dominated_rows(points).tolist(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
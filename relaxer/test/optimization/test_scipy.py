@@ -0,0 +1,81 @@
+from fractions import Fraction
+import random
+import unittest
+
+import numpy as np
+from scipy.optimize import linprog
+
+from relaxer.logical.lra import (
+    Inequality,
+    InequalitySymbol,
+    RelaxationVariable,
+    Sum,
+    Summand,
+)
+from relaxer.optimization.pareto import ParetoSet
+from relaxer.optimization.scipy import ScalarizationOptimizer
+
+
+def _linprog_optima(weights, A, b):
+    """Solves the LPs of a term with linprog, as for terms with several variables."""
+    solutions = ParetoSet()
+    for weight_vector in weights:
+        res = linprog(
+            -np.array(weight_vector, dtype=float),
+            A_ub=A,
+            b_ub=b,
+            bounds=(None, None),
+            method="highs",
+        )
+        if res.success:
+            solutions.add(tuple(res.x))
+    return solutions.to_set()
+
+
+class TestScalarizationOptimizer(unittest.TestCase):
+    def test_univariate_equals_linprog(self):
+        rng = random.Random(0)
+        for weights in ([(1.0,)], [(2.0,), (0.5,)], [(1.0,), (-1.0,)]):
+            sut = ScalarizationOptimizer(weights)
+            for _ in range(100):
+                n = rng.randint(1, 5)
+                A = np.array(
+                    [[rng.choice([-2.0, -1.0, -0.5, 0.5, 1.0, 3.0])] for _ in range(n)]
+                )
+                # The variable is bounded from above
+                A[0, 0] = abs(A[0, 0])
+                b = np.array([float(rng.randint(-5, 9)) for _ in range(n)])
+
+                solutions = ParetoSet()
+                sut._maximize_univariate(A, b, solutions)
+
+                expected = _linprog_optima(weights, A, b)
+                actual = solutions.to_set()
+                self.assertEqual(len(actual), len(expected), (weights, A, b))
+                for point, expected_point in zip(sorted(actual), sorted(expected)):
+                    np.testing.assert_allclose(point, expected_point)
+
+    def test_maximize_con_relaxation(self):
+        relax = RelaxationVariable(0)
+        constraints = [
+            Inequality(
+                Sum((Summand(Fraction(1), relax),)),
+                InequalitySymbol.LessThan,
+                Fraction(3),
+            ),
+            Inequality(
+                Sum((Summand(Fraction(1), relax),)),
+                InequalitySymbol.GreaterEqual,
+                Fraction(0),
+            ),
+        ]
+        sut = ScalarizationOptimizer([(1.0,)])
+        solutions, _ = sut.maximize_con_relaxation(
+            constraints, [relax], Fraction(1, 10)
+        )
+        self.assertEqual(len(solutions), 1)
+        np.testing.assert_allclose(next(iter(solutions)), (2.9,))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+import tempfile
+import unittest
+from unittest import mock
+
+from relaxer.io import JSONFileOutput
+
+
+class TestJSONFileOutput(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "output.json"
+
+    def test_keeps_existing_records(self):
+        self.path.write_text(json.dumps({"model": "existing"}))
+
+        sut = JSONFileOutput(self.path)
+        sut.write_stats({"value": 1}, "a", "t0")
+        sut.close()
+
+        self.assertEqual(
+            json.loads(self.path.read_text()),
+            [{"model": "existing"}, {"model": "a", "timestamp": "t0", "value": 1}],
+        )
+
+    def test_appends_on_flush(self):
+        sut = JSONFileOutput(self.path)
+        expected = []
+        with mock.patch.object(
+            Path, "read_bytes", autospec=True, side_effect=Path.read_bytes
+        ) as read_bytes, mock.patch.object(
+            Path, "write_text", autospec=True, side_effect=Path.write_text
+        ) as write_text:
+            for i in range(5):
+                sut.write_stats({"value": i}, "a", f"t{i}")
+                sut.write_stats({"value": float("inf")}, "b", f"t{i}")
+                expected += [
+                    {"model": "a", "timestamp": f"t{i}", "value": i},
+                    {"model": "b", "timestamp": f"t{i}", "value": float("inf")},
+                ]
+                sut.flush()
+                self.assertEqual(json.loads(self.path.read_text()), expected)
+            sut.close()
+
+        # Only the first flush reads and serializes the whole file
+        self.assertEqual(read_bytes.call_count, 1)
+        self.assertEqual(write_text.call_count, 1)
+
+    def test_buffers_until_flush(self):
+        sut = JSONFileOutput(self.path)
+        sut.write_stats({"value": 1}, "a", "t0")
+        self.assertFalse(self.path.exists())
+
+        sut.close()
+        self.assertTrue(self.path.exists())
@@ -1,4 +1,7 @@
+import operator
+from dataclasses import dataclass, field
 from typing import (
+    Any,
     Callable,
     Collection,
     Dict,
@@ -6,7 +9,6 @@ from typing import (
     Iterable,
     Optional,
     Sequence,
-    Set,
     Tuple,
 )
 
@@ -29,48 +31,127 @@ from relaxer.ta import (
     SymbolicState,
 )
 from relaxer.tracing.system import SystemState, SystemTransition
-from relaxer.tracing.uppyyl.relaxation import GuardRelaxation, InvariantRelaxation
+from relaxer.tracing.uppyyl.relaxation import (
+    GuardRelaxation,
+    InvariantRelaxation,
+    Relaxation,
+)
+
+
+# Relaxation ids by location id and cleaned clock constraint
+InvariantRelaxationIds = Dict[Tuple[str, str], int]
+# Relaxation ids by source id, target id and cleaned clock constraint
+GuardRelaxationIds = Dict[Tuple[str, str, str], int]
+
+
+@dataclass
+class UppyylConversionCache:
+    """Conversions shared by the states and transitions of one system.
+
+    The entries are keyed by ids of uppyyl objects, which stay valid as long as the system keeps them alive.
+    """
+
+    # Converted locations by the id of the uppyyl location and the process, None if an invariant depends on variables
+    locations: Dict[Tuple[int, str], Optional[Location]] = field(default_factory=dict)
+    # Names of the local clocks by the id of the uppyyl declaration
+    clocks: Dict[int, FrozenSet[str]] = field(default_factory=dict)
+    # Uppyyl ASTs of integer expressions and their compiled form by the id of the AST, the AST is kept to
+    # keep its id valid
+    evaluators: Dict[int, Tuple[Any, Callable[[Any], int]]] = field(
+        default_factory=dict
+    )
+    # Uppyyl clock constraints with their clock name, operator and limit AST by the id of the constraint, the
+    # constraint is kept to keep its id valid
+    constraints: Dict[int, Tuple[Any, str, Operator, Any]] = field(default_factory=dict)
+    # Converted clock constraints with a constant limit by the id of the uppyyl constraint, the process and the
+    # relaxation id, the constraints are kept alive by the parsed constraints
+    static_constraints: Dict[Tuple[int, str, Optional[int]], ClockConstraint] = field(
+        default_factory=dict
+    )
+    # Uppyyl clock constraints with the id of their relaxation by the id of the constraint, None if the
+    # constraint is not relaxed, the constraint is kept to keep its id valid
+    relaxation_ids: Dict[int, Tuple[Any, Optional[int]]] = field(default_factory=dict)
+    # Ids of the locations by their name by the id of the uppyyl template
+    location_ids: Dict[int, Dict[str, str]] = field(default_factory=dict)
+
+    def local_clocks(self, declaration) -> FrozenSet[str]:
+        clocks = self.clocks.get(id(declaration))
+        if clocks is None:
+            clocks = frozenset(declaration.clocks)
+            self.clocks[id(declaration)] = clocks
+        return clocks
+
+    def location_id(self, template, location_name: str) -> Optional[str]:
+        location_ids = self.location_ids.get(id(template))
+        if location_ids is None:
+            location_ids = {}
+            for location in template.locations.values():
+                location_ids.setdefault(location.name, location.id)
+            self.location_ids[id(template)] = location_ids
+        return location_ids.get(location_name)
 
 
 class UppyylSystemState:
+    # A state is created for every explored state, so the instances use __slots__ instead of a __dict__
+    __slots__ = ("_uppyyl_state", "_invariant_relaxations", "_cache", "_symbolic")
+
     def __init__(
-        self, uppyyl_state, invariant_relaxations: Dict[InvariantRelaxation, int]
+        self,
+        uppyyl_state,
+        invariant_relaxations: InvariantRelaxationIds,
+        cache: Optional[UppyylConversionCache] = None,
     ):
         self._uppyyl_state = uppyyl_state
         self._invariant_relaxations = invariant_relaxations
+        # The cache must only be shared by states of the same system and relaxations
+        self._cache = UppyylConversionCache() if cache is None else cache
+        self._symbolic: Optional[SymbolicState] = None
 
     @property
     def uppyyl(self):
         return self._uppyyl_state
 
+    def location_id(self, process: str, location_name: str) -> Optional[str]:
+        """Returns the id of the location with the given name in the template of a process, None if there is none."""
+        template = self._uppyyl_state.location_state[process].parent
+        return self._cache.location_id(template, location_name)
+
     @property
     def symbolic(self) -> SymbolicState:
-        locations = set(
-            (
-                self._location_from_uppyyl_location(location, process)
-                for process, location in self._uppyyl_state.location_state.items()
+        if self._symbolic is None:
+            locations = set(
+                (
+                    self._location_from_uppyyl_location(location, process)
+                    for process, location in self._uppyyl_state.location_state.items()
+                )
             )
-        )
+            self._symbolic = SymbolicState(frozenset(locations))
 
-        return SymbolicState(frozenset(locations))
+        return self._symbolic
 
     def _location_from_uppyyl_location(self, location, process: str) -> Location:
-        invariants: Set[ClockConstraint] = set()
-        for uppyyl_invariant in location.invariants:
-            invariant = self.clock_constraints_from_uppyyl(
-                uppyyl_invariant, location.parent.declaration.clocks, process
-            )
-            is_relaxed, relaxation_id = self._uppyl_invariant_relaxed(
-                uppyyl_invariant, location.id
-            )
-
-            if is_relaxed:
-                invariant = ClockConstraint(
-                    invariant.clock, invariant.operator, invariant.limit, relaxation_id
+        key = (id(location), process)
+        cached = self._cache.locations.get(key)
+        if cached is not None:
+            return cached
+
+        converted = self._convert_uppyyl_location(location, process)
+        if key not in self._cache.locations:
+            # The limits of the invariants are evaluated in this state, so only constant ones can be shared
+            self._cache.locations[key] = (
+                converted
+                if all(
+                    UppyylSystemState._is_constant_expression(
+                        uppyyl_invariant.ast["expr"]["right"]
+                    )
+                    for uppyyl_invariant in location.invariants
                 )
+                else None
+            )
+        return converted
 
-            invariants.add(invariant)
-
+    def _convert_uppyyl_location(self, location, process: str) -> Location:
+        local_clocks = self._cache.local_clocks(location.parent.declaration)
         is_urgent = location.urgent or location.committed
 
         return Location(
@@ -78,27 +159,70 @@ class UppyylSystemState:
             process=process,
             name=location.name,
             urgent=is_urgent,
-            invariants=frozenset(invariants),
+            invariants=frozenset(
+                self._convert_uppyyl_invariant(
+                    uppyyl_invariant, location, local_clocks, process
+                )
+                for uppyyl_invariant in location.invariants
+            ),
+        )
+
+    def _convert_uppyyl_invariant(
+        self, uppyyl_invariant, location, local_clocks: Iterable[str], process: str
+    ) -> ClockConstraint:
+        _, relaxation_id = self._uppyl_invariant_relaxed(uppyyl_invariant, location.id)
+        return self.clock_constraints_from_uppyyl(
+            uppyyl_invariant, local_clocks, process, relaxation_id
         )
 
     def clock_constraints_from_uppyyl(
-        self, constraint, local_clocks: Iterable[str], process: str
+        self,
+        constraint,
+        local_clocks: Iterable[str],
+        process: str,
+        relaxation_id: Optional[int] = None,
     ) -> ClockConstraint:
-        expression = constraint.ast["expr"]
-        return self.clock_constraint_from_uppyyl_expression(
-            expression, expression["left"]["name"], local_clocks, process
+        # The local clocks are the clocks of the template of the constraint, so they are the same on every call
+        static_key = (id(constraint), process, relaxation_id)
+        static = self._cache.static_constraints.get(static_key)
+        if static is not None:
+            return static
+
+        parsed = self._cache.constraints.get(id(constraint))
+        if parsed is None:
+            expression = constraint.ast["expr"]
+            parsed = (
+                constraint,
+                expression["left"]["name"],
+                UppyylSystemState._operator_from_uppyyl_expression(expression),
+                expression["right"],
+            )
+            self._cache.constraints[id(constraint)] = parsed
+        _, clock_name, op, limit_expression = parsed
+        clock = UppyylSystemState._to_clock(clock_name, local_clocks, process)
+        limit = self._expression_to_int(limit_expression, process)
+        clock_constraint = ClockConstraint.interned(
+            clock=clock, operator=op, limit=limit, relaxation_idx=relaxation_id
         )
+        if UppyylSystemState._is_constant_expression(limit_expression):
+            self._cache.static_constraints[static_key] = clock_constraint
+        return clock_constraint
 
     def _uppyl_invariant_relaxed(
         self, constraint, location_id: str
     ) -> Tuple[bool, Optional[int]]:
-        rel = InvariantRelaxation.create(
-            location_id=location_id,
-            uppaal_clock_constraint=constraint.text,
-        )
-        if rel in self._invariant_relaxations:
-            return True, self._invariant_relaxations[rel]
-        return False, None
+        cached = self._cache.relaxation_ids.get(id(constraint))
+        if cached is None:
+            # An invariant belongs to one location, so the key is the same in every state
+            cached = (
+                constraint,
+                self._invariant_relaxations.get(
+                    (location_id, Relaxation.clean_clock_constraint(constraint.text))
+                ),
+            )
+            self._cache.relaxation_ids[id(constraint)] = cached
+        relaxation_id = cached[1]
+        return relaxation_id is not None, relaxation_id
 
     def clock_constraint_from_uppyyl_expression(
         self,
@@ -106,38 +230,66 @@ class UppyylSystemState:
         clock_name: str,
         local_clocks: Iterable[str],
         process: str,
+        relaxation_id: Optional[int] = None,
     ) -> ClockConstraint:
         clock = UppyylSystemState._to_clock(clock_name, local_clocks, process)
         op = UppyylSystemState._operator_from_uppyyl_expression(expression)
         limit = self._expression_to_int(expression["right"], process)
-        return ClockConstraint(clock=clock, operator=op, limit=limit)  # type: ignore
+        return ClockConstraint.interned(
+            clock=clock, operator=op, limit=limit, relaxation_idx=relaxation_id
+        )
 
     def _expression_to_int(self, expression, process: str) -> int:
+        cached = self._cache.evaluators.get(id(expression))
+        if cached is None:
+            cached = (
+                expression,
+                UppyylSystemState._compile_int_expression(expression),
+            )
+            self._cache.evaluators[id(expression)] = cached
+        return cached[1](self._uppyyl_state)
+
+    @staticmethod
+    def _compile_int_expression(expression) -> Callable[[Any], int]:
+        """Compiles an integer expression into a function, which evaluates it in a uppyyl state."""
         astType = expression["astType"]
         if astType == "Integer":
-            return expression["val"]
+            value = expression["val"]
+            return lambda uppyyl_state: value
         if astType == "Variable":
             variable_name = expression["name"]
-            variable = self._uppyyl_state.get(variable_name)
-            return int(variable.val)
+            return lambda uppyyl_state: int(uppyyl_state.get(variable_name).val)
         if astType == "BinaryExpr":
-            op = expression["op"]
-            operation = UppyylSystemState._uppyyl_int_op_to_int_operation[op]
-            return operation(
-                self._expression_to_int(expression["left"], process),
-                self._expression_to_int(expression["right"], process),
+            operation = UppyylSystemState._uppyyl_int_op_to_int_operation[
+                expression["op"]
+            ]
+            left = UppyylSystemState._compile_int_expression(expression["left"])
+            right = UppyylSystemState._compile_int_expression(expression["right"])
+            return lambda uppyyl_state: operation(
+                left(uppyyl_state), right(uppyyl_state)
             )
 
         raise ValueError(f"Unsupported expression: {expression}")
 
+    @staticmethod
+    def _is_constant_expression(expression) -> bool:
+        astType = expression["astType"]
+        if astType == "Integer":
+            return True
+        if astType == "BinaryExpr":
+            return UppyylSystemState._is_constant_expression(
+                expression["left"]
+            ) and UppyylSystemState._is_constant_expression(expression["right"])
+        return False
+
     _uppyyl_int_op_to_int_operation: Dict[str, Callable[[int, int], int]] = {
-        "Add": lambda x, y: x + y,
-        "Sub": lambda x, y: x - y,
-        "Mult": lambda x, y: x * y,
-        "Div": lambda x, y: x // y,
-        "RShift": lambda x, y: x >> y,
-        "LShift": lambda x, y: x << y,
-        "Mod": lambda x, y: x % y,
+        "Add": operator.add,
+        "Sub": operator.sub,
+        "Mult": operator.mul,
+        "Div": operator.floordiv,
+        "RShift": operator.rshift,
+        "LShift": operator.lshift,
+        "Mod": operator.mod,
         "Minimum": min,
         "Maximum": max,
     }
@@ -148,7 +300,7 @@ class UppyylSystemState:
         if clock_name not in local_clocks:
             clock_process = None
 
-        clock = Clock(name=clock_name, process=clock_process)
+        clock = Clock.interned(name=clock_name, process=clock_process)
         return clock
 
     @staticmethod
@@ -157,37 +309,62 @@ class UppyylSystemState:
         Converts an operator from a uppzl expression to a symbolic operator.
         """
         op = expression["op"]
-        if op == "GreaterThan":
-            return Operator.GreaterThan
-        elif op == "GreaterEqual":
-            return Operator.GreaterEqual
-        elif op == "Equal":
-            return Operator.Equal
-        elif op == "LessEqual":
-            return Operator.LessEqual
-        elif op == "LessThan":
-            return Operator.LessThan
-        elif op == "NotEqual":
-            return Operator.NotEqual
-        else:
+        try:
+            return UppyylSystemState._uppyyl_op_to_operator[op]
+        except KeyError:
             raise ValueError(f"Unknown operator: {op}")
 
+    _uppyyl_op_to_operator: Dict[str, Operator] = {
+        "GreaterThan": Operator.GreaterThan,
+        "GreaterEqual": Operator.GreaterEqual,
+        "Equal": Operator.Equal,
+        "LessEqual": Operator.LessEqual,
+        "LessThan": Operator.LessThan,
+        "NotEqual": Operator.NotEqual,
+    }
+
 
 class UppyylSystemTransition:
+    __slots__ = (
+        "_uppyyl_transition",
+        "_cache",
+        "_source",
+        "_target",
+        "_guard_relaxations",
+        "_edges",
+    )
+
     def __init__(
         self,
         uppyyl_transition,
-        invariant_relaxations: Dict[InvariantRelaxation, int],
-        guard_relaxations: Dict[GuardRelaxation, int],
+        invariant_relaxations: InvariantRelaxationIds,
+        guard_relaxations: GuardRelaxationIds,
+        cache: Optional[UppyylConversionCache] = None,
+        source: Optional[UppyylSystemState] = None,
     ) -> None:
+        """Initialize the transition.
+
+        Args:
+            uppyyl_transition: Transition of the uppyyl simulator.
+            invariant_relaxations (InvariantRelaxationIds): Relaxation ids of the invariants.
+            guard_relaxations (GuardRelaxationIds): Relaxation ids of the guards.
+            cache (UppyylConversionCache, optional): Conversions shared with the other states and transitions of the system. Defaults to a new cache.
+            source (UppyylSystemState, optional): The state the transition was computed from, which is reused as its source instead of wrapping the source state again. Defaults to None.
+        """
         self._uppyyl_transition = uppyyl_transition
-        self._source = UppyylSystemState(
-            uppyyl_transition.source_state, invariant_relaxations
+        self._cache = UppyylConversionCache() if cache is None else cache
+        self._source = (
+            UppyylSystemState(
+                uppyyl_transition.source_state, invariant_relaxations, self._cache
+            )
+            if source is None
+            else source
         )
         self._target = UppyylSystemState(
-            uppyyl_transition.target_state, invariant_relaxations
+            uppyyl_transition.target_state, invariant_relaxations, self._cache
         )
         self._guard_relaxations = guard_relaxations
+        self._edges: Optional[FrozenSet[Edge]] = None
 
     @property
     def source(self) -> SystemState:
@@ -199,76 +376,85 @@ class UppyylSystemTransition:
 
     @property
     def edges(self) -> FrozenSet[Edge]:
-        edges: Set[Edge] = set()
-        for process, edge in self._uppyyl_transition.triggered_edges.items():
-            if edge is None:
-                continue
-
-            guards = self._guards_from_uppyyl_edge(edge, process)
-            resets = self._resets_from_uppyyl_edge(edge, process)
-
-            edges.add(
-                Edge(
-                    source_id=edge.source.id,
-                    target_id=edge.target.id,
-                    process=process,
-                    guards=frozenset(guards),
-                    resets=frozenset(resets),
-                )
+        if self._edges is None:
+            self._edges = self._edges_from_uppyyl_transition()
+        return self._edges
+
+    def _edges_from_uppyyl_transition(self) -> FrozenSet[Edge]:
+        return frozenset(
+            Edge(
+                source_id=edge.source.id,
+                target_id=edge.target.id,
+                process=process,
+                guards=self._guards_from_uppyyl_edge(edge, process),
+                resets=self._resets_from_uppyyl_edge(edge, process),
             )
+            for process, edge in self._uppyyl_transition.triggered_edges.items()
+            if edge is not None
+        )
 
-        return frozenset(edges)
-
-    def _guards_from_uppyyl_edge(self, edge, process: str) -> Set[ClockConstraint]:
+    def _guards_from_uppyyl_edge(
+        self, edge, process: str
+    ) -> FrozenSet[ClockConstraint]:
         """
         Extracts the List of guards from a uppyyl edge.
         """
-        guards: Set[ClockConstraint] = set()
-
-        for uppyyl_guard in edge.clock_guards:
-            guard = self._source.clock_constraints_from_uppyyl(
-                uppyyl_guard, edge.parent.declaration.clocks, process
-            )
-
-            is_relaxed, relaxation_id = self._uppyl_guard_relaxed(
-                uppyyl_guard, edge.source.id, edge.target.id
-            )
-            if is_relaxed:
-                guard = ClockConstraint(
-                    guard.clock, guard.operator, guard.limit, relaxation_id
-                )
-
-            guards.add(guard)
+        local_clocks = self._cache.local_clocks(edge.parent.declaration)
+        return frozenset(
+            self._convert_uppyyl_guard(uppyyl_guard, edge, local_clocks, process)
+            for uppyyl_guard in edge.clock_guards
+        )
 
-        return guards
+    def _convert_uppyyl_guard(
+        self, uppyyl_guard, edge, local_clocks: Iterable[str], process: str
+    ) -> ClockConstraint:
+        _, relaxation_id = self._uppyl_guard_relaxed(
+            uppyyl_guard, edge.source.id, edge.target.id
+        )
+        return self._source.clock_constraints_from_uppyyl(
+            uppyyl_guard, local_clocks, process, relaxation_id
+        )
 
-    def _resets_from_uppyyl_edge(self, edge, process: str) -> Set[Clock]:
+    def _resets_from_uppyyl_edge(self, edge, process: str) -> FrozenSet[Clock]:
         """
         Converts a uppyyl transition to a list of resets.
         """
-        resets: Set[Clock] = set()
-
-        for reset in edge.resets:
-            clock_name = reset.ast["expr"]["left"]["name"]
-            clock_process = process
-            if clock_name not in edge.parent.declaration.clocks:  # type: ignore
-                clock_process = None
+        local_clocks = self._cache.local_clocks(edge.parent.declaration)
+        return frozenset(
+            self._convert_uppyyl_reset(reset, local_clocks, process)
+            for reset in edge.resets
+        )
 
-            resets.add(Clock(name=clock_name, process=clock_process))
+    @staticmethod
+    def _convert_uppyyl_reset(
+        reset, local_clocks: Iterable[str], process: str
+    ) -> Clock:
+        clock_name = reset.ast["expr"]["left"]["name"]
+        clock_process = process
+        if clock_name not in local_clocks:
+            clock_process = None
 
-        return resets
+        return Clock.interned(name=clock_name, process=clock_process)
 
     def _uppyl_guard_relaxed(
         self, constraint, source_id: str, target_id: str
     ) -> Tuple[bool, Optional[int]]:
-        rel = GuardRelaxation.create(
-            source_id=source_id,
-            target_id=target_id,
-            uppaal_clock_constraint=constraint.text,
-        )
-        if rel in self._guard_relaxations:
-            return True, self._guard_relaxations[rel]
-        return False, None
+        cached = self._cache.relaxation_ids.get(id(constraint))
+        if cached is None:
+            # A guard belongs to one edge, so the key is the same in every transition
+            cached = (
+                constraint,
+                self._guard_relaxations.get(
+                    (
+                        source_id,
+                        target_id,
+                        Relaxation.clean_clock_constraint(constraint.text),
+                    )
+                ),
+            )
+            self._cache.relaxation_ids[id(constraint)] = cached
+        relaxation_id = cached[1]
+        return relaxation_id is not None, relaxation_id
 
 
 class UppyylTASystem:
@@ -285,8 +471,27 @@ class UppyylTASystem:
         self._guard_relax: Dict[GuardRelaxation, int] = self._init_relaxation_dict(
             guard_relax, offset
         )
+        # The relaxation ids by the attributes of the relaxations, so lookups need no relaxation objects
+        self._inv_relax_ids: InvariantRelaxationIds = {
+            (relaxation.location_id, relaxation.uppaal_clock_constraint): relaxation_id
+            for relaxation, relaxation_id in self._inv_relax.items()
+        }
+        self._guard_relax_ids: GuardRelaxationIds = {
+            (
+                relaxation.source_id,
+                relaxation.target_id,
+                relaxation.uppaal_clock_constraint,
+            ): relaxation_id
+            for relaxation, relaxation_id in self._guard_relax.items()
+        }
 
         self._transition_cache: Dict[SymbolicState, Tuple[SystemTransition, ...]] = {}
+        # The uppyyl objects live as long as the system, so their ids stay valid
+        self._conversion_cache = UppyylConversionCache()
+        # The safety property of each query if it is the same in every state, else None
+        self._static_properties: Optional[Tuple[Optional[Expression], ...]] = None
+        # The safety properties, if they are the same in every state
+        self._state_independent_properties: Optional[Tuple[Expression, ...]] = None
 
         with open(path, "r") as f:
             self._system = uppaal_xml_to_system(f.read())
@@ -294,7 +499,9 @@ class UppyylTASystem:
         simulator = UppyylSimulator()
         simulator.set_system(self._system)
 
-        self._initial_state = UppyylSystemState(simulator.system_state, self._inv_relax)
+        self._initial_state = UppyylSystemState(
+            simulator.system_state, self._inv_relax_ids, self._conversion_cache
+        )
 
     def _init_relaxation_dict(self, relaxations: Iterable, offset: int = 0):
         return {relax: offset + relax_id for relax_id, relax in enumerate(relaxations)}
@@ -308,11 +515,38 @@ class UppyylTASystem:
         return len(self._inv_relax) + len(self._guard_relax)
 
     def safety_properties(self, state: SystemState) -> Tuple[Expression, ...]:
+        if self._state_independent_properties is not None:
+            return self._state_independent_properties
+
+        if self._static_properties is None:
+            # Unsupported queries raise here, before their ASTs are inspected
+            properties = tuple(
+                (
+                    UppyylTASystem._safety_properties_from_uppyyl_query(query, state)
+                    for query in self._system.queries
+                )
+            )
+            self._static_properties = tuple(
+                (
+                    prop
+                    if UppyylTASystem._is_state_independent(
+                        query.formula.ast["prop"]["prop"]["expr"]
+                    )
+                    else None
+                )
+                for prop, query in zip(properties, self._system.queries)
+            )
+            if all(prop is not None for prop in self._static_properties):
+                self._state_independent_properties = properties
+            return properties
+
         return tuple(
             (
                 UppyylTASystem._safety_properties_from_uppyyl_query(query, state)
-                for query in self._system.queries
+                if prop is None
+                else prop
             )
+            for prop, query in zip(self._static_properties, self._system.queries)
         )
 
     def outgoing_transitions(self, state: SystemState) -> Collection[SystemTransition]:
@@ -323,7 +557,11 @@ class UppyylTASystem:
 
         return [
             UppyylSystemTransition(
-                uppyyl_transition, self._inv_relax, self._guard_relax
+                uppyyl_transition,
+                self._inv_relax_ids,
+                self._guard_relax_ids,
+                self._conversion_cache,
+                state,
             )
             for uppyyl_transition in uppyyl_transitions
         ]
@@ -355,6 +593,26 @@ class UppyylTASystem:
         except UnsupportedQueryError:
             raise UnsupportedQueryError(formula.text)
 
+    @staticmethod
+    def _is_state_independent(expr) -> bool:
+        """Returns whether a supported predicate converts to the same expression in every state.
+
+        Location predicates only depend on the templates, but the limits of clock constraints may depend on variables.
+        """
+        if expr["astType"] == "BinaryExpr":
+            if expr["op"] in {"LogOr", "LogAnd"}:
+                return UppyylTASystem._is_state_independent(
+                    expr["left"]
+                ) and UppyylTASystem._is_state_independent(expr["right"])
+            if expr["op"] == "Dot":
+                return True
+            return UppyylSystemState._is_constant_expression(expr["right"])
+
+        if expr["astType"] in {"UnaryExpr", "BracketExpr"}:
+            return UppyylTASystem._is_state_independent(expr["expr"])
+
+        return False
+
     @staticmethod
     def _uppyyl_expression_to_expression(expr, state: UppyylSystemState) -> Expression:
         if expr["astType"] == "BinaryExpr":
@@ -399,13 +657,9 @@ class UppyylTASystem:
                 process_name = expr["left"]["name"]
                 location_name = expr["right"]["name"]
 
-                process_uppyyl_locations = state.uppyyl.location_state[
-                    process_name
-                ].parent.locations
-
-                for location in process_uppyyl_locations.values():
-                    if location.name == location_name:
-                        return LocationPredicate(location.id)
+                location_id = state.location_id(process_name, location_name)
+                if location_id is not None:
+                    return LocationPredicate(location_id)
 
             elif expr["op"] == "LogOr":
                 return BooleanOr(
@@ -453,49 +707,47 @@ def get_relaxation_for_bounds_of_system(
 ) -> Tuple[Sequence[InvariantRelaxation], Sequence[GuardRelaxation]]:
     with open(path, "r") as f:
         system = uppaal_xml_to_system(f.read())
-    invariant_relaxations = []
-    guard_relaxations = []
+    # Dicts keep the order of the relaxations and drop duplicates, e.g. equal guards of parallel edges
+    invariant_relaxations: Dict[InvariantRelaxation, None] = {}
+    guard_relaxations: Dict[GuardRelaxation, None] = {}
 
     simulator = UppyylSimulator()
     simulator.set_system(system)
-    initial_state = UppyylSystemState(simulator.system_state, {})
 
     active_templates = set(
-        (l.parent for l in initial_state.uppyyl.location_state.values())
+        (l.parent for l in simulator.system_state.location_state.values())
     )
 
     for template in active_templates:
         for l_id, location in template.locations.items():
             for invariant in location.invariants:
-                cc = initial_state.clock_constraints_from_uppyyl(invariant, [], "")
-                if only_upper and not (
-                    cc.operator is Operator.LessEqual
-                    or cc.operator is Operator.LessThan
-                ):
+                if only_upper and not _is_upper_bound(invariant):
                     continue
 
-                invariant_relaxations.append(
+                invariant_relaxations[
                     InvariantRelaxation.create(
                         uppaal_clock_constraint=invariant.text,
                         location_id=l_id,
                     )
-                )
+                ] = None
 
         for edge in template.edges.values():
             for guard in edge.clock_guards:
-                cc = initial_state.clock_constraints_from_uppyyl(guard, [], "")
-                if only_upper and not (
-                    cc.operator is Operator.LessEqual
-                    or cc.operator is Operator.LessThan
-                ):
+                if only_upper and not _is_upper_bound(guard):
                     continue
 
-                guard_relaxations.append(
+                guard_relaxations[
                     GuardRelaxation.create(
                         uppaal_clock_constraint=guard.text,
                         source_id=edge.source.id,
                         target_id=edge.target.id,
                     )
-                )
+                ] = None
+
+    return list(invariant_relaxations), list(guard_relaxations)
+
 
-    return invariant_relaxations, guard_relaxations
+def _is_upper_bound(constraint) -> bool:
+    # Only the operator is needed, so the limit is not evaluated
+    op = UppyylSystemState._operator_from_uppyyl_expression(constraint.ast["expr"])
+    return op is Operator.LessEqual or op is Operator.LessThan